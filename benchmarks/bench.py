@@ -0,0 +1,404 @@
+"""
+Benchmarks of betterconf: decoration, construction, providers and casters.
+
+    python benchmarks/bench.py [--json PATH] [--baseline PATH] [--threshold 1.25] [--filter TEXT] [--quick]
+
+Every benchmark is timed with `timeit` (best of several repeats) and reported in ns per operation.
+With `--baseline` the results are compared with a previous `--json` output, and the exit code is 1
+if anything got slower than `--threshold` times the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+import typing
+from pathlib import Path
+
+# the working tree is measured, not an installed copy
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from betterconf import Alias, betterconf, field, reference_field  # noqa: E402
+from betterconf.caster import (  # noqa: E402
+    to_bool,
+    to_float,
+    to_int,
+    to_list,
+    to_logging_log_level,
+    to_loguru_log_level,
+)
+from betterconf.exceptions import ImpossibleToCastError, VariableNotFoundError  # noqa: E402
+from betterconf.provider import (  # noqa: E402
+    SOURCE_CACHE,
+    AbstractProvider,
+    DotenvProvider,
+    EnvironmentProvider,
+    JSONProvider,
+)
+
+Setup = typing.Callable[[Path], typing.Callable[[], typing.Any]]
+
+# name -> setup, which prepares everything once and returns the measured operation
+BENCHMARKS: typing.Dict[str, Setup] = {}
+
+FIELDS = 20
+
+
+def benchmark(name: str) -> typing.Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def _flat_namespace(prefix: str) -> typing.Dict[str, typing.Any]:
+    for i in range(FIELDS):
+        os.environ[f"{prefix}_f{i}"] = str(i)
+    return {"__annotations__": {f"f{i}": int for i in range(FIELDS)}}
+
+
+@benchmark("decorate/flat")
+def decorate_flat(tmp: Path) -> typing.Callable[[], typing.Any]:
+    annotations = {f"f{i}": int for i in range(FIELDS)}
+    # a new class every time, as decorating changes it
+    return lambda: betterconf(type("Flat", (), {"__annotations__": annotations}))
+
+
+@benchmark("decorate/nested")
+def decorate_nested(tmp: Path) -> typing.Callable[[], typing.Any]:
+    def make() -> typing.Any:
+        inner = betterconf(type("Inner", (), {"__annotations__": {"host": str, "port": int}}), subconfig=True)
+        return betterconf(type("Outer", (), {"__annotations__": {"debug": bool}, "debug": False, "Inner": inner}))
+
+    return make
+
+
+@benchmark("construct/flat")
+def construct_flat(tmp: Path) -> typing.Callable[[], typing.Any]:
+    # the regular `__init__`, not compiled
+    return betterconf(type("Flat", (), _flat_namespace("BENCH_FLAT")), prefix="BENCH_FLAT")
+
+
+@benchmark("construct/flat-default-provider")
+def construct_flat_default_provider(tmp: Path) -> typing.Callable[[], typing.Any]:
+    # the most common config: plain names read from the environment by `DEFAULT_PROVIDER`
+    namespace = _flat_namespace("BENCH_DEFAULT")
+    namespace["__annotations__"] = {f"BENCH_DEFAULT_f{i}": int for i in range(FIELDS)}
+    return betterconf(type("Flat", (), namespace))
+
+
+@benchmark("construct/flat-compiled")
+def construct_flat_compiled(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return betterconf(type("Flat", (), _flat_namespace("BENCH_FLAT")), prefix="BENCH_FLAT", compiled=True)
+
+
+@benchmark("construct/nested")
+def construct_nested(tmp: Path) -> typing.Callable[[], typing.Any]:
+    @betterconf
+    class Nested:
+        debug: bool = False
+
+        @betterconf(subconfig=True)
+        class Database:
+            host: str = "localhost"
+            port: int = 5432
+
+            @betterconf(subconfig=True)
+            class Pool:
+                size: int = 10
+                timeout: float = 1.5
+
+        @betterconf(subconfig=True)
+        class Cache:
+            url: str = "redis://localhost"
+            ttl: int = 60
+
+    return Nested
+
+
+@benchmark("construct/aliased")
+def construct_aliased(tmp: Path) -> typing.Callable[[], typing.Any]:
+    annotations: typing.Dict[str, typing.Any] = {}
+    for i in range(FIELDS):
+        os.environ[f"BENCH_ALIAS_{i}"] = str(i)
+        annotations[f"f{i}"] = Alias[int, f"BENCH_ALIAS_{i}"]
+    return betterconf(type("Aliased", (), {"__annotations__": annotations}))
+
+
+@benchmark("construct/references")
+def construct_references(tmp: Path) -> typing.Callable[[], typing.Any]:
+    @betterconf
+    class References:
+        host = field("BENCH_REF_HOST", default="localhost")
+        port = field("BENCH_REF_PORT", default=8080)
+        url = reference_field(host, port, func=lambda h, p: f"http://{h}:{p}")
+        health = reference_field(url, func=lambda u: f"{u}/health")
+        metrics = reference_field(url, func=lambda u: f"{u}/metrics")
+        admin = reference_field(url, func=lambda u: f"{u}/admin")
+        summary = reference_field(health, metrics, admin, func=lambda *urls: ",".join(urls))
+
+    return References
+
+
+class _RaisingProvider(AbstractProvider):
+    """Tells about a missing value only by raising"""
+
+    def __init__(self, values: typing.Dict[str, str]):
+        self.values = values
+
+    def get(self, name: str) -> str:
+        if name not in self.values:
+            raise VariableNotFoundError(name)
+        return self.values[name]
+
+
+class _LookupProvider(_RaisingProvider):
+    def lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        return self.values.get(name, missing)
+
+
+def _missing_values(provider_type: typing.Type[_RaisingProvider]) -> typing.Callable[[], typing.Any]:
+    # 100 fields, 90 of them fall back to defaults
+    values = {f"FIELD_{i}": str(i) for i in range(0, 100, 10)}
+    namespace = {f"field_{i}": field(f"FIELD_{i}", default="default") for i in range(100)}
+    return betterconf(type("Missing", (), namespace), provider=provider_type(values))
+
+
+@benchmark("construct/missing-raising")
+def construct_missing_raising(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return _missing_values(_RaisingProvider)
+
+
+@benchmark("construct/missing-lookup")
+def construct_missing_lookup(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return _missing_values(_LookupProvider)
+
+
+@benchmark("provider/env-get")
+def provider_env_get(tmp: Path) -> typing.Callable[[], typing.Any]:
+    os.environ["BENCH_ENV"] = "value"
+    provider = EnvironmentProvider()
+    return lambda: provider.get("BENCH_ENV")
+
+
+@benchmark("provider/env-get-many")
+def provider_env_get_many(tmp: Path) -> typing.Callable[[], typing.Any]:
+    _flat_namespace("BENCH_MANY")
+    provider = EnvironmentProvider()
+    names = [f"BENCH_MANY_f{i}" for i in range(FIELDS)]
+    return lambda: provider.get_many(names)
+
+
+def _json_provider(tmp: Path) -> JSONProvider:
+    document = {
+        f"section{i}": {f"group{j}": {f"key{k}": k for k in range(10)} for j in range(10)}
+        for i in range(10)
+    }
+    path = tmp / "bench.json"
+    path.write_text(json.dumps(document))
+    return JSONProvider.from_path(path)
+
+
+@benchmark("provider/json-parse")
+def provider_json_parse(tmp: Path) -> typing.Callable[[], typing.Any]:
+    path = _json_provider(tmp).sources()[0]
+
+    def load() -> None:
+        SOURCE_CACHE.clear()
+        JSONProvider.from_path(path).get("section5.group5.key5")
+
+    return load
+
+
+@benchmark("provider/json-nested-get")
+def provider_json_nested_get(tmp: Path) -> typing.Callable[[], typing.Any]:
+    provider = _json_provider(tmp)
+    return lambda: provider.get("section5.group5.key5")
+
+
+@benchmark("provider/json-nested-get-many")
+def provider_json_nested_get_many(tmp: Path) -> typing.Callable[[], typing.Any]:
+    provider = _json_provider(tmp)
+    names = [f"section{i}.group{i}.key{i}" for i in range(10)]
+    return lambda: provider.get_many(names)
+
+
+def _dotenv(tmp: Path) -> Path:
+    path = tmp / ".env"
+    path.write_text("".join(f"BENCH_DOTENV_{i}=value{i}\n" for i in range(100)))
+    return path
+
+
+@benchmark("provider/dotenv-in-get")
+def provider_dotenv_in_get(tmp: Path) -> typing.Callable[[], typing.Any]:
+    provider = DotenvProvider(_dotenv(tmp))
+    provider.load_into_provider()
+    return lambda: provider.get("BENCH_DOTENV_50")
+
+
+@benchmark("provider/dotenv-env-get")
+def provider_dotenv_env_get(tmp: Path) -> typing.Callable[[], typing.Any]:
+    provider = DotenvProvider(_dotenv(tmp))
+    provider.load_into_env()
+    return lambda: provider.get("BENCH_DOTENV_50")
+
+
+@benchmark("provider/dotenv-parse")
+def provider_dotenv_parse(tmp: Path) -> typing.Callable[[], typing.Any]:
+    path = _dotenv(tmp)
+
+    def load() -> None:
+        # otherwise the file is parsed once and taken from the cache after
+        SOURCE_CACHE.clear()
+        DotenvProvider(path).load_into_provider()
+
+    return load
+
+
+@benchmark("caster/int")
+def caster_int(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return lambda: to_int.cast("12345")
+
+
+@benchmark("caster/float")
+def caster_float(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return lambda: to_float.cast("3,1415")
+
+
+@benchmark("caster/bool")
+def caster_bool(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return lambda: to_bool.cast("Yes")
+
+
+@benchmark("caster/list")
+def caster_list(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return lambda: to_list.cast("a,b,c,d,e,")
+
+
+@benchmark("caster/logging-level")
+def caster_logging_level(tmp: Path) -> typing.Callable[[], typing.Any]:
+    return lambda: to_logging_log_level.cast("warning")
+
+
+# values in every case, constant casters look them up lowercased
+_CONSTANT_CASES = [
+    (to_bool, ["true", "TRUE", "Off", "no", "On", "0"]),
+    (to_logging_log_level, ["DEBUG", "WARNING", "CRITICAL", "NOTSET"]),
+    (to_loguru_log_level, ["info", "SUCCESS", "Trace", "critical"]),
+]
+
+
+def _legacy_constant_cast(caster: typing.Any, val: str) -> typing.Any:
+    """`ConstantCaster.cast` before the lookup table: a scan over `ABLE_TO_CAST`"""
+    if val in caster.ABLE_TO_CAST:
+        return caster.ABLE_TO_CAST.get(val.lower())
+    for key in caster.ABLE_TO_CAST:
+        if isinstance(key, tuple) and val.lower() in key:
+            return caster.ABLE_TO_CAST[key]
+        elif isinstance(key, str) and val.lower() == key:
+            return caster.ABLE_TO_CAST[key]
+    raise ImpossibleToCastError(val, caster)
+
+
+@benchmark("caster/constant-lookup")
+def caster_constant_lookup(tmp: Path) -> typing.Callable[[], typing.Any]:
+    casts = [(caster.cast, value) for caster, values in _CONSTANT_CASES for value in values]
+    return lambda: [cast(value) for cast, value in casts]
+
+
+@benchmark("caster/constant-lookup-legacy")
+def caster_constant_lookup_legacy(tmp: Path) -> typing.Callable[[], typing.Any]:
+    # the same values through the old scan, to compare with `caster/constant-lookup`
+    casts = [(caster, value) for caster, values in _CONSTANT_CASES for value in values]
+    return lambda: [_legacy_constant_cast(caster, value) for caster, value in casts]
+
+
+def measure(operation: typing.Callable[[], typing.Any], repeat: int, min_time: float) -> float:
+    """Best time of one operation in ns"""
+    timer = timeit.Timer(operation)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    return best / number * 1e9
+
+
+def run(
+    names: typing.Iterable[str], repeat: int, min_time: float
+) -> typing.Dict[str, typing.Dict[str, float]]:
+    results: typing.Dict[str, typing.Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            ns = measure(BENCHMARKS[name](Path(tmp)), repeat, min_time)
+            results[name] = {"ns_per_op": round(ns, 1), "ops_per_sec": round(1e9 / ns, 1)}
+            print(f"{name:<32} {ns:>12.1f} ns/op", flush=True)
+    return results
+
+
+def compare(
+    results: typing.Dict[str, typing.Dict[str, float]],
+    baseline: typing.Dict[str, typing.Dict[str, float]],
+    threshold: float,
+) -> typing.List[str]:
+    """Print the results against the baseline, return the names of the regressed benchmarks"""
+    regressed: typing.List[str] = []
+    print(f"\n{'benchmark':<32} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<32} {'-':>12} {result['ns_per_op']:>12.1f} {'new':>8}")
+            continue
+
+        ratio = result["ns_per_op"] / baseline[name]["ns_per_op"]
+        mark = ""
+        if ratio > threshold:
+            mark = "  slower"
+            regressed.append(name)
+        elif ratio < 1 / threshold:
+            mark = "  faster"
+        print(f"{name:<32} {baseline[name]['ns_per_op']:>12.1f} {result['ns_per_op']:>12.1f} {ratio:>7.2f}x{mark}")
+    return regressed
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of betterconf")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare with the results in this file")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25, help="slowdown against the baseline to fail on (default 1.25)"
+    )
+    parser.add_argument("--filter", default="", help="run only the benchmarks with this in their names")
+    parser.add_argument("--quick", action="store_true", help="fewer and shorter repeats, for a smoke run")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    repeat, min_time = (2, 0.005) if args.quick else (5, 0.2)
+    results = run(names, repeat, min_time)
+
+    if args.json:
+        output = {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "results": results,
+        }
+        args.json.write_text(json.dumps(output, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressed = compare(results, baseline, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} benchmark(s) got slower than {args.threshold}x the baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
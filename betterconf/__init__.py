@@ -2,15 +2,26 @@
 Python configs made smooth and easy.
 """
 
+import importlib
+import typing
+
 from .decorator import betterconf
+from ._frozen import reload
 from ._config import Prefix
 from ._field import field, Field, constant_field, reference_field, value
 from ._specials import Alias
+from ._schema import enable_schema_cache, disable_schema_cache
+from .observe import Observer, SlowestFields, set_observer, observing
 from .provider import (
     AbstractProvider,
+    AsyncAbstractProvider,
+    AsyncMemoryProvider,
     JSONProvider,
+    TOMLProvider,
     EnvironmentProvider,
     DotenvProvider,
+    SnapshotProvider,
+    LayeredProvider,
 )
 from .caster import (
     to_int,
@@ -25,18 +36,43 @@ from .exceptions import (
     ImpossibleToCastError,
     BetterconfError,
     VariableNotFoundError,
+    FrozenConfigError,
 )
 
+if typing.TYPE_CHECKING:
+    from .watch import ConfigWatcher, ConfigDiff, FieldChange
+
+# names imported on first access, so `import betterconf` doesn't pay for what isn't used
+_LAZY = {
+    "ConfigWatcher": ".watch",
+    "ConfigDiff": ".watch",
+    "FieldChange": ".watch",
+}
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
 __author__ = "prostomarkeloff"
 __all__ = (
     "betterconf",
+    "reload",
     "field",
     "Field",
     "constant_field",
     "value",
     "reference_field",
     "AbstractProvider",
+    "AsyncAbstractProvider",
+    "AsyncMemoryProvider",
     "JSONProvider",
+    "TOMLProvider",
     "Alias",
     "Prefix",
     "EnvironmentProvider",
@@ -50,6 +86,18 @@ __all__ = (
     "BetterconfError",
     "VariableNotFoundError",
     "ImpossibleToCastError",
+    "FrozenConfigError",
     "DotenvProvider",
+    "SnapshotProvider",
+    "LayeredProvider",
+    "ConfigWatcher",
+    "ConfigDiff",
+    "FieldChange",
+    "enable_schema_cache",
+    "disable_schema_cache",
+    "Observer",
+    "SlowestFields",
+    "set_observer",
+    "observing",
     "__author__",
 )
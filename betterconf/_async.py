@@ -0,0 +1,69 @@
+import asyncio
+import typing
+
+from betterconf._field import _PREFETCHED  # type: ignore
+from betterconf.provider import (
+    AbstractProvider,
+    AsyncAbstractProvider,
+    DEFAULT_PROVIDER,
+)
+
+if typing.TYPE_CHECKING:
+    from betterconf._config import ConfigProto
+
+CT = typing.TypeVar("CT", bound="ConfigProto")
+
+
+def _collect(
+    cfg: typing.Type["ConfigProto"],
+    provider_override: typing.Optional[AbstractProvider],
+    to_override: typing.Dict[str, typing.Any],
+    grouped: typing.Dict[int, typing.Tuple[AbstractProvider, typing.List[str]]],
+) -> None:
+    """Gather names of all fields in the config and its subconfigs, grouped by provider"""
+    fallback_provider = cfg.__bc_provider__ or DEFAULT_PROVIDER
+    in_config = {id(info.field) for info in cfg.__bc_inner__.fields}
+    for field in cfg.__bc_inner__.order:
+        if field.name is None:
+            continue
+
+        if id(field) in in_config:
+            provider = provider_override or field.provider or fallback_provider
+        else:
+            provider = field.provider or DEFAULT_PROVIDER
+        if id(provider) not in grouped:
+            grouped[id(provider)] = (provider, [])
+        grouped[id(provider)][1].append(field.name)
+
+    for sub_config in cfg.__bc_inner__.sub_configs:
+        # subconfigs are constructed without `_provider_`, as in `__init__`
+        if sub_config.name not in to_override:
+            _collect(sub_config.cfg, None, to_override, grouped)
+
+
+async def _fetch(
+    provider: AbstractProvider, names: typing.List[str]
+) -> typing.Dict[str, typing.Any]:
+    if isinstance(provider, AsyncAbstractProvider):
+        return await provider.get_many_typed(names)
+    return provider.get_many_typed(names)
+
+
+async def aload(
+    cfg: typing.Type[CT],
+    provider_override: typing.Optional[AbstractProvider],
+    to_override: typing.Dict[str, typing.Any],
+) -> CT:
+    grouped: typing.Dict[int, typing.Tuple[AbstractProvider, typing.List[str]]] = {}
+    _collect(cfg, provider_override, to_override, grouped)
+
+    results = await asyncio.gather(
+        *(_fetch(provider, names) for provider, names in grouped.values())
+    )
+
+    # all values are here, so the usual construction doesn't touch providers at all
+    token = _PREFETCHED.set(dict(zip(grouped, results)))
+    try:
+        return cfg(provider_override, **to_override)  # type: ignore
+    finally:
+        _PREFETCHED.reset(token)
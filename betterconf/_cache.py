@@ -0,0 +1,76 @@
+import os
+import threading
+import typing
+from collections import OrderedDict
+
+if typing.TYPE_CHECKING:
+    from pathlib import Path
+
+T = typing.TypeVar("T")
+
+
+class CacheStats(typing.NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    maxsize: int
+
+
+class SourceCache:
+    """Parsed files shared by all providers reading them.
+    A file is parsed again only when its mtime or size changes, the least recently used files are dropped first"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        # (path, kind) -> ((mtime, size), parsed)
+        self._entries: OrderedDict[
+            typing.Tuple[str, typing.Hashable], typing.Tuple[typing.Tuple[int, int], typing.Any]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(
+        self,
+        path: typing.Union[str, "Path"],
+        kind: typing.Hashable,
+        parse: typing.Callable[[typing.BinaryIO], T],
+    ) -> T:
+        """Return the parsed file, `parse` gets it opened in binary mode.
+        `kind` tells apart different parsers (and their options) of the same file.
+        Parsed values are shared, so they must never be modified"""
+        key = (os.path.abspath(path), kind)
+        with open(path, mode="rb") as f:
+            stat = os.fstat(f.fileno())
+            stamp = (stat.st_mtime_ns, stat.st_size)
+
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == stamp:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry[1]
+                self._misses += 1
+
+            parsed = parse(f)
+
+        with self._lock:
+            if self.maxsize > 0:
+                self._entries[key] = (stamp, parsed)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return parsed
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, len(self._entries), self.maxsize)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+SOURCE_CACHE = SourceCache()
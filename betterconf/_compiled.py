@@ -0,0 +1,207 @@
+import typing
+
+from betterconf._field import Sentinel, _Field as Field, _Reference, _get_many  # type: ignore
+from betterconf.caster import DEFAULT_CASTER
+from betterconf.exceptions import VariableNotFoundError, ImpossibleToCastError
+from betterconf.provider import AbstractProvider, DEFAULT_PROVIDER
+
+if typing.TYPE_CHECKING:
+    from betterconf._config import ConfigInner, ConfigProto
+
+# how a field falls back when its provider has nothing
+REQUIRED = 0
+CONSTANT = 1
+FACTORY = 2
+REFERENCE = 3
+FIELD = 4
+
+_MISSING = object()
+
+Groups = typing.Tuple[
+    typing.Tuple[typing.Optional[AbstractProvider], typing.Tuple[str, ...]], ...
+]
+
+
+class FieldPlan(typing.NamedTuple):
+    # None for the fields which are only referenced by the config ones
+    name_in_python: typing.Optional[str]
+    key: typing.Optional[str]
+    provider: AbstractProvider
+    cast: typing.Optional[typing.Callable[[str], typing.Any]]
+    default: typing.Any
+    default_kind: int
+    ignore_caster_error: bool
+    field: Field[typing.Any]
+    # indexes in `LoaderPlan.groups` and `LoaderPlan.override_groups`, -1 for the fields without a key
+    group: int
+    override_group: int
+
+
+class LoaderPlan(typing.NamedTuple):
+    inner: "ConfigInner"
+    # dependencies go first
+    fields: typing.Tuple[FieldPlan, ...]
+    # keys to fetch from every provider with a single `get_many`
+    groups: Groups
+    # the same when `_provider_` is given; None stands for it
+    override_groups: Groups
+    sub_configs: typing.Tuple[typing.Tuple[str, typing.Type["ConfigProto"]], ...]
+
+
+def _default_kind(default: typing.Any) -> int:
+    if isinstance(default, Sentinel):
+        return REQUIRED
+    if isinstance(default, _Reference):
+        return REFERENCE
+    if isinstance(default, Field):
+        return FIELD
+    if callable(default):
+        return FACTORY
+    return CONSTANT
+
+
+def _add_to_group(
+    groups: typing.Dict[
+        int, typing.Tuple[typing.Optional[AbstractProvider], typing.List[str]]
+    ],
+    provider: typing.Optional[AbstractProvider],
+    key: str,
+) -> int:
+    if id(provider) not in groups:
+        groups[id(provider)] = (provider, [])
+    groups[id(provider)][1].append(key)
+    return list(groups).index(id(provider))
+
+
+def compile_plan(cfg: typing.Type["ConfigProto"]) -> LoaderPlan:
+    """Flatten `cfg.__bc_inner__` into a plan which doesn't need any checks per construction"""
+    fallback_provider = cfg.__bc_provider__ or DEFAULT_PROVIDER
+    names: typing.Dict[int, typing.List[str]] = {}
+    for info in cfg.__bc_inner__.fields:
+        names.setdefault(id(info.field), []).append(info.name_in_python)
+
+    fields: typing.List[FieldPlan] = []
+    groups: typing.Dict[int, typing.Any] = {}
+    override_groups: typing.Dict[int, typing.Any] = {}
+    for field in cfg.__bc_inner__.order:
+        in_config = id(field) in names
+        caster = field.caster
+        provider = field.provider or (
+            fallback_provider if in_config else DEFAULT_PROVIDER
+        )
+
+        group = override_group = -1
+        if field.name is not None:
+            group = _add_to_group(groups, provider, field.name)
+            override_group = _add_to_group(
+                override_groups, None if in_config else provider, field.name
+            )
+
+        for name_in_python in names.get(id(field), [None]):
+            fields.append(
+                FieldPlan(
+                    name_in_python=name_in_python,
+                    key=field.name,
+                    provider=provider,
+                    cast=None if caster is DEFAULT_CASTER else caster.cast,
+                    default=field.default,
+                    default_kind=_default_kind(field.default),
+                    ignore_caster_error=field.ignore_caster_error,
+                    field=field,
+                    group=group,
+                    override_group=override_group,
+                )
+            )
+
+    sub_configs = tuple((sub.name, sub.cfg) for sub in cfg.__bc_inner__.sub_configs)
+    return LoaderPlan(
+        inner=cfg.__bc_inner__,
+        fields=tuple(fields),
+        groups=tuple((p, tuple(keys)) for p, keys in groups.values()),
+        override_groups=tuple((p, tuple(keys)) for p, keys in override_groups.values()),
+        sub_configs=sub_configs,
+    )
+
+
+def _provider_of(
+    plan: LoaderPlan,
+    fp: FieldPlan,
+    provider_override: typing.Optional[AbstractProvider],
+) -> AbstractProvider:
+    if provider_override is not None and plan.override_groups[fp.override_group][0] is None:
+        return provider_override
+    return fp.provider
+
+
+def load(
+    self: "ConfigProto",
+    plan: LoaderPlan,
+    provider_override: typing.Optional[AbstractProvider],
+    to_override: typing.Dict[str, typing.Any],
+) -> None:
+    use_override = provider_override is not None
+    if use_override:
+        results = [
+            _get_many(provider or provider_override, keys)  # type: ignore
+            for provider, keys in plan.override_groups
+        ]
+    else:
+        results = [_get_many(provider, keys) for provider, keys in plan.groups]  # type: ignore
+
+    resolved: typing.Dict[int, typing.Any] = {}
+    for fp in plan.fields:
+        group = fp.override_group if use_override else fp.group
+
+        if fp.name_in_python in to_override:
+            # same semantics as the regular `__init__`: an override is the field's default
+            found = results[group] if group >= 0 else {}
+            value = fp.field._get_value_from(
+                found,
+                resolved,
+                to_override[fp.name_in_python],
+                _provider_of(plan, fp, provider_override),
+            )
+
+        else:
+            raw = _MISSING if fp.key is None else results[group].get(fp.key, _MISSING)
+            if raw is _MISSING:
+                kind = fp.default_kind
+                if kind == CONSTANT:
+                    value = fp.default
+                elif kind == REFERENCE:
+                    value = fp.default.resolve(resolved)
+                elif kind == FIELD:
+                    value = resolved[id(fp.default)]
+                elif kind == FACTORY:
+                    value = fp.default()
+                elif fp.key is None:
+                    raise VariableNotFoundError(
+                        "No name was given, as is a default value"
+                    )
+                else:
+                    raise VariableNotFoundError(fp.key)
+
+            elif raw.__class__ is not str:
+                # a typed value (see `AbstractProvider.get_typed`)
+                value = fp.field._cast(raw, _provider_of(plan, fp, provider_override))
+
+            elif fp.cast is None:
+                value = raw
+
+            else:
+                try:
+                    value = fp.cast(raw)
+                except ImpossibleToCastError as e:
+                    if not fp.ignore_caster_error:
+                        raise e
+                    value = e.val
+
+        resolved[id(fp.field)] = value
+        if fp.name_in_python is not None:
+            object.__setattr__(self, fp.name_in_python, value)
+
+    for name, cfg in plan.sub_configs:
+        if name in to_override:
+            object.__setattr__(self, name, to_override[name])
+        else:
+            object.__setattr__(self, name, cfg(**to_override))
@@ -1,10 +1,16 @@
+import types
 import typing
-from betterconf.provider import AbstractProvider
-from betterconf._field import _NO_DEFAULT, _Field as Field  # type: ignore
+import weakref
+from betterconf.provider import AbstractProvider, DEFAULT_PROVIDER
+from betterconf._field import _NO_DEFAULT, _Field as Field, _Reference, _Resolution, _ResolutionPlan, _dependencies, _plan  # type: ignore
 from betterconf._specials import is_special, AliasSpecial
 from betterconf.caster import BUILTIN_CASTERS
+from betterconf._compiled import LoaderPlan, compile_plan
 from dataclasses import dataclass
+from functools import cached_property
+from betterconf._lazy import LazySubConfig
 from betterconf.exceptions import BetterconfError
+from betterconf import _schema
 
 FT = typing.TypeVar("FT")
 
@@ -27,6 +33,10 @@ class ConfigProto(typing.Protocol):
     __bc_inner__: typing.ClassVar["ConfigInner"]
     __bc_prefix__: typing.ClassVar[typing.Optional[Prefix]]
     __bc_provider__: typing.ClassVar[typing.Optional[AbstractProvider]]
+    __bc_compiled__: typing.ClassVar[bool]
+    __bc_slots__: typing.ClassVar[bool]
+    __bc_frozen__: typing.ClassVar[bool]
+    __bc_plan__: typing.ClassVar[typing.Optional[LoaderPlan]]
 
 
 @dataclass
@@ -42,19 +52,10 @@ class FieldInfo(typing.Generic[FT]):
         annotation: FT,
         provider: typing.Optional[AbstractProvider] = None,
         prefix: typing.Optional[Prefix] = None,
+        inherited: bool = False,
     ) -> typing.Self:
-        # for types like int, str, etc AND not initialized with `field`
-        if annotation in BUILTIN_CASTERS and name not in src.__dict__:
-            caster = BUILTIN_CASTERS[annotation]
-            name_in_field = Prefix.process_name(name, prefix)
-            return cls(
-                name_in_python=name,
-                field=Field(name=name_in_field, caster=caster, provider=provider),
-            )
-
-        # if it is our special annotations
-        elif is_special(annotation):
-            default = getattr(src, name, _NO_DEFAULT)
+        if is_special(annotation):
+            default = _class_value(src, name)
 
             if isinstance(annotation, AliasSpecial):
                 name_in_field = Prefix.process_name(annotation.alias, prefix)
@@ -65,7 +66,7 @@ class FieldInfo(typing.Generic[FT]):
                 field_info.name_in_python = name
                 if isinstance(default, Field):
                     # var: Alias[str, "VAR"] = field(...)
-                    field_info.field = default
+                    field_info.field = default._copy() if inherited else default
 
                 elif default is not _NO_DEFAULT:
                     field_info.field.default = default
@@ -77,26 +78,42 @@ class FieldInfo(typing.Generic[FT]):
 
                 return field_info
 
-        elif (
-            annotation in BUILTIN_CASTERS
-            and name in src.__dict__
-            and isinstance(getattr(src, name), Field)
-        ):
-            field = typing.cast(Field[FT], getattr(src, name))
-            field.caster = BUILTIN_CASTERS[annotation]
+        spec = _spec_of(src, name, annotation)
+        if spec is None:
+            raise BetterconfError(
+                "Something bad happened.\nBetterconf can't deal with this kind of value.\nProbably you've tried to use something like 'dict' in a constant manner. For this special case use 'constant_field`"
+            )
+        return cls.build(src, name, spec, provider, prefix, inherited)
 
-            if not field.provider:
-                field.provider = provider
-            if not field.name:
-                field.name = name
+    @classmethod
+    def build(
+        cls,
+        src: type,
+        name: str,
+        spec: _schema.Spec,
+        provider: typing.Optional[AbstractProvider] = None,
+        prefix: typing.Optional[Prefix] = None,
+        inherited: bool = False,
+    ) -> typing.Self:
+        """Make the field as `_spec_of` has told.
+        `inherited` fields are declared in a base of the config being parsed, so their `Field`s belong to the base"""
+        kind, type_name = spec
+        if kind == BUILTIN:
+            # for types like int, str, etc AND not initialized with `field`
+            name_in_field = Prefix.process_name(name, prefix)
+            return cls(
+                name_in_python=name,
+                field=Field(name=name_in_field, caster=_builtin_caster(type_name), provider=provider),
+            )
+
+        if kind == DECLARED:
+            field: Field[FT] = _class_value(src, name)
+            if inherited:
+                # the base may have given the field its own provider already
+                field = field._copy()
+            if type_name is not None:
+                field.caster = _builtin_caster(type_name)
 
-            return cls(name_in_python=name, field=field)
-        elif (
-            annotation not in BUILTIN_CASTERS
-            and name in src.__dict__
-            and isinstance(getattr(src, name), Field)
-        ):
-            field: Field[FT] = getattr(src, name)
             if not field.provider:
                 field.provider = provider
             if not field.name:
@@ -104,29 +121,76 @@ class FieldInfo(typing.Generic[FT]):
 
             return cls(name_in_python=name, field=field)
 
-        elif (
-            annotation in BUILTIN_CASTERS
-            and name in src.__dict__
-            and isinstance(getattr(src, name), annotation)
-        ):
-            name_in_field = Prefix.process_name(name, prefix)
-            val: typing.Any = getattr(src, name)
-            field = Field(name=name_in_field, default=val, provider=provider)
-            return cls(name_in_python=name, field=field)
+        name_in_field = Prefix.process_name(name, prefix)
+        val: typing.Any = _class_value(src, name)
+        field = Field(name=name_in_field, default=val, provider=provider)
+        return cls(name_in_python=name, field=field)
 
-        elif (
-            annotation in BUILTIN_CASTERS
-            and name in src.__dict__
-            and not isinstance(getattr(src, name), annotation)
-        ):
-            raise BetterconfError(
-                f"You try to set the value {repr(getattr(src, name))} for the field with name '{name}', that has type {annotation}.\nThe type {type(getattr(src, name))} is not assignable to type {annotation}"
-            )
+
+# kinds of annotated fields, see `_spec_of`
+BUILTIN = "builtin"
+DECLARED = "declared"
+CONSTANT = "constant"
+
+
+def _builtin_type(type_name: typing.Optional[str]) -> typing.Optional[type]:
+    for tp in BUILTIN_CASTERS:
+        if tp.__name__ == type_name:
+            return tp
+    return None
+
+
+def _builtin_caster(type_name: typing.Optional[str]) -> typing.Any:
+    tp = _builtin_type(type_name)
+    if tp is None:
+        raise BetterconfError(f"There's no builtin caster for '{type_name}'")
+    return BUILTIN_CASTERS[tp]
+
+
+def _spec_matches(src: type, name: str, spec: _schema.Spec) -> bool:
+    """Whether a stored spec still fits the class: a body can depend on the environment, not only on its source"""
+    kind, type_name = spec
+    value = _class_value(src, name)
+    if kind == BUILTIN:
+        return value is _NO_DEFAULT and _builtin_type(type_name) is not None
+    if kind == DECLARED:
+        return isinstance(value, Field) and (type_name is None or _builtin_type(type_name) is not None)
+    tp = _builtin_type(type_name)
+    return kind == CONSTANT and tp is not None and isinstance(value, tp)
+
+
+def _class_value(src: type, name: str) -> typing.Any:
+    """The value `name` is given in the body of `src`, `_NO_DEFAULT` if there's none"""
+    value = src.__dict__.get(name, _NO_DEFAULT)
+    if isinstance(value, types.MemberDescriptorType):
+        # a slot of a slotted config: `_slotted` keeps the value aside
+        return src.__dict__.get("__bc_body__", {}).get(name, _NO_DEFAULT)
+    return value
+
+
+def _spec_of(src: type, name: str, annotation: typing.Any) -> typing.Optional[_schema.Spec]:
+    """How the annotated field is made: `int` alone, `int = field(...)` or `int = 1`.
+    None for special annotations and ones Betterconf can't deal with"""
+    value = _class_value(src, name)
+    if annotation in BUILTIN_CASTERS and value is _NO_DEFAULT:
+        return BUILTIN, annotation.__name__
+
+    if is_special(annotation):
+        return None
+
+    if isinstance(value, Field):
+        return DECLARED, annotation.__name__ if annotation in BUILTIN_CASTERS else None
+
+    if annotation in BUILTIN_CASTERS:
+        if isinstance(value, annotation):
+            return CONSTANT, annotation.__name__
 
         raise BetterconfError(
-            "Something bad happened.\nBetterconf can't deal with this kind of value.\nProbably you've tried to use something like 'dict' in a constant manner. For this special case use 'constant_field`"
+            f"You try to set the value {repr(value)} for the field with name '{name}', that has type {annotation}.\nThe type {type(value)} is not assignable to type {annotation}"
         )
 
+    return None
+
 
 @dataclass
 class SubConfigInfo:
@@ -143,15 +207,200 @@ class SubConfigInfo:
         if not src.__bc_provider__:
             src.__bc_provider__ = provider
 
-        inner = ConfigInner.parse_into(src, provider, prefix)
+        if getattr(src, "__bc_slots__", False):
+            # fields aren't in the slotted class anymore, so it can't be parsed again
+            inner = src.__bc_inner__.with_provider(provider, prefix)
+        else:
+            inner = ConfigInner.parse_into(src, provider, prefix)
         src.__bc_inner__ = inner
+        # the parent could give new providers to the fields, so the plan is stale now
+        if getattr(src, "__bc_compiled__", False):
+            src.__bc_plan__ = compile_plan(src)
         return cls(name=src.__name__, cfg=src)
 
 
+# evaluated annotations of every class (with its bases) parsed so far, see `_type_hints`
+_TYPE_HINTS: "weakref.WeakKeyDictionary[type, typing.Dict[str, typing.Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _type_hints(cfg: type) -> typing.Dict[str, typing.Any]:
+    """`typing.get_type_hints(cfg, include_extras=True)`, but annotations of a base are evaluated only once
+    for all its subclasses"""
+    hints = _TYPE_HINTS.get(cfg)
+    if hints is not None:
+        return hints
+
+    own: typing.Dict[str, typing.Any] = cfg.__dict__.get("__annotations__", {})
+    if any(isinstance(annotation, str) for annotation in own.values()):
+        # forward references are left to `typing`
+        hints = typing.get_type_hints(cfg, include_extras=True)
+    else:
+        hints = {}
+        for base in reversed(cfg.__mro__[1:]):
+            if base is not object:
+                hints.update(_type_hints(base))
+        for name, annotation in own.items():
+            hints[name] = type(None) if annotation is None else annotation
+
+    _TYPE_HINTS[cfg] = hints
+    return hints
+
+
+def _owner_of(cfg: type, name: str) -> type:
+    """The class in the hierarchy defining `name`, inherited fields are parsed there to keep their defaults"""
+    for klass in cfg.__mro__:
+        if name in klass.__dict__ or name in klass.__dict__.get("__annotations__", ()):
+            return klass
+    return cfg
+
+
+def _inherited_info(
+    cfg: type,
+    name: str,
+    provider: typing.Optional[AbstractProvider],
+    prefix: typing.Optional[Prefix],
+) -> typing.Optional[FieldInfo[typing.Any]]:
+    """A field the closest decorated base has already parsed with the same provider and prefix"""
+    for base in cfg.__mro__[1:]:
+        inner: typing.Optional[ConfigInner] = base.__dict__.get("__bc_inner__")
+        if inner is None:
+            continue
+        if base.__dict__.get("__bc_prefix__") != prefix or base.__dict__.get("__bc_provider__") is not provider:
+            return None
+
+        info = inner.fields_by_info.get(name)
+        if info is None or info.field.provider is None:
+            return None
+        return info
+    return None
+
+
+def _resolution_order(
+    fields_info: typing.List[FieldInfo[typing.Any]],
+) -> typing.List[Field[typing.Any]]:
+    """Sort fields (with the ones they reference) so every field goes after its dependencies"""
+    if not any(isinstance(info.field.default, (_Reference, Field)) for info in fields_info):
+        # nothing references anything, the order is as declared
+        return list({id(info.field): info.field for info in fields_info}.values())
+
+    order: typing.List[Field[typing.Any]] = []
+    done: typing.Set[int] = set()
+    path: typing.List[Field[typing.Any]] = []
+
+    def visit(field: Field[typing.Any]) -> None:
+        if id(field) in done:
+            return
+        if field in path:
+            cycle = path[path.index(field) :] + [field]
+            raise BetterconfError(
+                "Fields reference each other in a cycle: "
+                + " -> ".join(str(f.name) for f in cycle)
+            )
+
+        path.append(field)
+        for dependency in _dependencies(field):
+            visit(dependency)
+        path.pop()
+
+        done.add(id(field))
+        order.append(field)
+
+    for info in fields_info:
+        visit(info.field)
+
+    return order
+
+
 @dataclass
 class ConfigInner:
     fields: typing.List[FieldInfo[typing.Any]]
     sub_configs: typing.List[SubConfigInfo]
+    # all fields of the config and the fields they reference, dependencies first
+    order: typing.List[Field[typing.Any]]
+
+    def with_provider(
+        self,
+        provider: typing.Optional[AbstractProvider],
+        prefix: typing.Optional[Prefix] = None,
+    ) -> "ConfigInner":
+        """Give the provider to fields (and subconfigs) without their own one"""
+        for info in self.fields:
+            if not info.field.provider:
+                info.field.provider = provider
+        # the providers have changed
+        self.__dict__.pop("_plans", None)
+        for sub_config in self.sub_configs:
+            SubConfigInfo.parse_into(sub_config.cfg, provider, prefix)
+        return self
+
+    def resolution(
+        self,
+        provider: typing.Optional[AbstractProvider],
+        provider_override: typing.Optional[AbstractProvider],
+        to_override: typing.Dict[str, typing.Any],
+    ) -> _Resolution:
+        """Prepare a construction: `provider` is the config's one, `provider_override` is `_provider_`"""
+        # nothing is written into the shared fields, so configs can be constructed concurrently
+        defaults: typing.Dict[int, typing.Any] = {}
+        if to_override:
+            fields_by_name = self.fields_by_name
+            for name, value in to_override.items():
+                if name in fields_by_name:
+                    defaults[id(fields_by_name[name])] = value
+
+        return _Resolution(self.plan(provider, provider_override), defaults)
+
+    @cached_property
+    def _plans(self) -> typing.Dict[int, _ResolutionPlan]:
+        # by `id(provider)`, the plan keeps the provider alive so the id isn't reused
+        return {}
+
+    def plan(
+        self,
+        provider: typing.Optional[AbstractProvider],
+        provider_override: typing.Optional[AbstractProvider] = None,
+    ) -> _ResolutionPlan:
+        """Providers of all fields, worked out once per config provider (and every time for `_provider_`)"""
+        if provider_override is None:
+            plan = self._plans.get(id(provider))
+            if plan is None:
+                plan = self._plans[id(provider)] = self._make_plan(provider, None)
+            return plan
+
+        return self._make_plan(provider, provider_override)
+
+    def _make_plan(
+        self,
+        provider: typing.Optional[AbstractProvider],
+        provider_override: typing.Optional[AbstractProvider],
+    ) -> _ResolutionPlan:
+        in_config = self.names_by_field
+        order: typing.List[typing.Tuple[Field[typing.Any], AbstractProvider]] = []
+        for field in self.order:
+            if id(field) in in_config:
+                field_provider = provider_override or field.provider or provider or DEFAULT_PROVIDER
+            else:
+                # only referenced by the config: `_provider_` isn't given to it
+                field_provider = field.provider or DEFAULT_PROVIDER
+            order.append((field, field_provider))
+        return _plan(order)
+
+    @cached_property
+    def fields_by_name(self) -> typing.Dict[str, Field[typing.Any]]:
+        return {info.name_in_python: info.field for info in self.fields}
+
+    @cached_property
+    def fields_by_info(self) -> typing.Dict[str, FieldInfo[typing.Any]]:
+        return {info.name_in_python: info for info in self.fields}
+
+    @cached_property
+    def names_by_field(self) -> typing.Dict[int, typing.List[str]]:
+        names: typing.Dict[int, typing.List[str]] = {}
+        for info in self.fields:
+            names.setdefault(id(info.field), []).append(info.name_in_python)
+        return names
 
     @classmethod
     def parse_into(
@@ -160,14 +409,40 @@ class ConfigInner:
         provider: typing.Optional[AbstractProvider] = None,
         prefix: typing.Optional[Prefix] = None,
     ) -> typing.Self:
-        try:
-            annotations = typing.get_type_hints(cfg, include_extras=True)
-        except TypeError:
-            annotations: typing.Dict[str, typing.Any] = {}
-
+        annotations: typing.Dict[str, typing.Any] = {}
+        schema = _schema.load(cfg)
+        if schema is not None and not all(
+            spec is not None and _spec_matches(_owner_of(cfg, name), name, spec)
+            for name, spec in schema.items()
+        ):
+            schema = None
+        if schema is None:
+            try:
+                annotations = _type_hints(cfg)
+            except TypeError:
+                pass
+
+            # special annotations (None) are parsed from the annotation every time
+            schema = {
+                name: _spec_of(_owner_of(cfg, name), name, annotation)
+                for name, annotation in annotations.items()
+            }
+            if schema and None not in schema.values():
+                _schema.store(cfg, typing.cast(_schema.Schema, schema))
+
+        own_annotations = cfg.__dict__.get("__annotations__", {})
         fields_info: typing.List[FieldInfo[typing.Any]] = []
-        for name, annotation in annotations.items():
-            if name in cfg.__dict__:
+        for name, spec in schema.items():
+            owner = cfg
+            if name not in cfg.__dict__ and name not in own_annotations:
+                # inherited: reused as the base has parsed it, or parsed in the class defining it
+                inherited = _inherited_info(cfg, name, provider, prefix)
+                if inherited is not None:
+                    fields_info.append(inherited)
+                    continue
+                owner = _owner_of(cfg, name)
+
+            elif isinstance(cfg.__dict__.get(name), Field):
                 name_in_python = Prefix.process_name(name, prefix) if prefix is not None else name
                 field: Field[typing.Any] = cfg.__dict__[name]
 
@@ -177,17 +452,18 @@ class ConfigInner:
                 fields_info.append(FieldInfo(name_in_python, field))
                 continue
 
-            parsed = FieldInfo[typing.Any].parse_into(
-                cfg,
-                name,
-                annotation,
-                provider,
-                prefix,
-            )
+            inherited = owner is not cfg
+            if spec is None:
+                parsed = FieldInfo.parse_into(owner, name, annotations[name], provider, prefix, inherited)
+            else:
+                parsed = FieldInfo.build(owner, name, spec, provider, prefix, inherited)
             fields_info.append(parsed)
 
         sub_configs: typing.List[SubConfigInfo] = []
         for name, element in cfg.__dict__.items():
+            if isinstance(element, LazySubConfig):
+                element = element.cfg
+
             if getattr(element, "__bc_subconfig__", False):
                 parsed = SubConfigInfo.parse_into(element, provider, prefix)
                 sub_configs.append(parsed)
@@ -200,4 +476,4 @@ class ConfigInner:
                 field_info = FieldInfo(name, typing.cast("Field[typing.Any]", element))
                 fields_info.append(field_info)
 
-        return cls(fields_info, sub_configs)
+        return cls(fields_info, sub_configs, _resolution_order(fields_info))
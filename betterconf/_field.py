@@ -1,10 +1,21 @@
+import copy
 import typing
+from contextvars import ContextVar
+from time import perf_counter_ns
 from typing import TypeVarTuple
 
 from betterconf.caster import AbstractCaster
 from betterconf.caster import DEFAULT_CASTER
-from betterconf.exceptions import VariableNotFoundError, ImpossibleToCastError
-from betterconf.provider import DEFAULT_PROVIDER, AbstractProvider
+from betterconf.exceptions import (
+    BetterconfError,
+    VariableNotFoundError,
+    ImpossibleToCastError,
+)
+from betterconf.provider import (
+    DEFAULT_PROVIDER,
+    AbstractProvider,
+    AsyncAbstractProvider,
+)
 
 
 class Sentinel:
@@ -14,11 +25,46 @@ class Sentinel:
 
 
 _NO_DEFAULT = Sentinel()
+# returned by `AbstractProvider.lookup` for missing values
+_MISSING = Sentinel()
 
 T = typing.TypeVar("T")
 Ts = TypeVarTuple("Ts")
 SentinelOrT = typing.Union[Sentinel, T]
 
+# values fetched before the construction has started (see `Config.aload`), keyed by `id(provider)`
+_PREFETCHED: ContextVar[typing.Optional[typing.Dict[int, typing.Dict[str, typing.Any]]]] = (
+    ContextVar("betterconf_prefetched", default=None)
+)
+
+
+def _ensure_sync(provider: AbstractProvider) -> None:
+    if isinstance(provider, AsyncAbstractProvider):
+        raise BetterconfError(
+            f"{provider.__class__.__name__} is async, construct your config with `await Config.aload()`"
+        )
+
+
+def _get(provider: AbstractProvider, name: str) -> typing.Any:
+    """The value or `_MISSING`"""
+    prefetched = _PREFETCHED.get()
+    if prefetched is not None and name in prefetched.get(id(provider), ()):
+        return prefetched[id(provider)][name]
+
+    _ensure_sync(provider)
+    return provider.lookup(name, _MISSING)
+
+
+def _get_many(
+    provider: AbstractProvider, names: typing.Iterable[str]
+) -> typing.Dict[str, typing.Any]:
+    prefetched = _PREFETCHED.get()
+    if prefetched is not None and id(provider) in prefetched:
+        return prefetched[id(provider)]
+
+    _ensure_sync(provider)
+    return provider.get_many_typed(names)
+
 
 class _Field(typing.Generic[T]):
     # NB: fields are:
@@ -36,29 +82,79 @@ class _Field(typing.Generic[T]):
     ):
         self.name = name
         self.provider = provider
+        # `provider` is given the config's one on decoration, this is what the user has given
+        self._own_provider = provider
         self.default = default
         self.caster = caster
         self.ignore_caster_error = ignore_caster_error
 
+    def _copy(self) -> "_Field[T]":
+        """The field as declared, without the provider a config has given it"""
+        copied = copy.copy(self)
+        copied.provider = self._own_provider
+        return copied
+
     def _get_value(self) -> T:
-        try:
-            if self.name is None:
-                raise VariableNotFoundError("No name was given, as is a default value")
+        provider = self.provider or DEFAULT_PROVIDER
+        inner_value = _MISSING if self.name is None else _get(provider, self.name)
+        if inner_value is _MISSING:
+            return self._get_default(self.name, self.default)
 
-            if not self.provider:
-                self.provider = DEFAULT_PROVIDER
+        return self._cast(inner_value, provider)
 
-            inner_value = self.provider.get(self.name)
-        except VariableNotFoundError as e:
-            if isinstance(self.default, Sentinel):
-                raise e
+    def _get_value_from(
+        self,
+        found: typing.Mapping[str, typing.Any],
+        resolved: typing.Mapping[int, typing.Any],
+        default: typing.Any,
+        provider: typing.Optional[AbstractProvider] = None,
+    ) -> T:
+        """The same as `_get_value`, but with values already fetched from the provider.
+        `resolved` holds values of other fields (by `id(field)`) this field may depend on,
+        `default` is used instead of `self.default`"""
+        inner_value = _MISSING if self.name is None else found.get(self.name, _MISSING)
+        if inner_value is _MISSING:
+            return self._get_default(self.name, default, resolved)
+
+        return self._cast(inner_value, provider)
+
+    @staticmethod
+    def _get_default(
+        name: typing.Optional[str],
+        default: typing.Any,
+        resolved: typing.Optional[typing.Mapping[int, typing.Any]] = None,
+    ) -> typing.Any:
+        # the error is only built when there's no default, misses with one cost nothing
+        if isinstance(default, Sentinel):
+            raise VariableNotFoundError(
+                "No name was given, as is a default value" if name is None else name
+            )
+
+        if resolved is not None:
+            if isinstance(default, _Reference):
+                return default.resolve(resolved)
+            if isinstance(default, _Field) and id(default) in resolved:
+                return resolved[id(default)]
+
+        if callable(default):
+            return default()
+        else:
+            return default
 
-            if callable(self.default):
-                return self.default()
-            else:
-                return self.default
+    def _cast(
+        self, inner_value: typing.Any, provider: typing.Optional[AbstractProvider] = None
+    ) -> T:
         try:
-            casted = self.caster.cast(inner_value)
+            if isinstance(inner_value, str):
+                casted = self.caster.cast(inner_value)
+            else:
+                # a typed value (see `AbstractProvider.get_typed`), the str one is the fallback.
+                # Casters don't have to subclass `AbstractCaster`, ones with only `cast` get the str
+                cast_typed = getattr(self.caster, "cast_typed", None)
+                casted = NotImplemented if cast_typed is None else cast_typed(inner_value)
+                if casted is NotImplemented:
+                    inner_value = (provider or DEFAULT_PROVIDER).to_str(inner_value)
+                    casted = self.caster.cast(inner_value)
 
         except ImpossibleToCastError as e:
             if self.ignore_caster_error:
@@ -74,11 +170,158 @@ class _Field(typing.Generic[T]):
     def value(self) -> T:
         return self._get_value()
 
+    # fields stay in the class: accessed from there they are just fields,
+    # from a lazy config (see `_lazy.py`) they are resolved on the first access
+    def __get__(self, instance: typing.Any, owner: typing.Any = None) -> typing.Any:
+        state = getattr(instance, "__dict__", {}).get("__bc_lazy__")
+        if state is None:
+            return self
+
+        return state.load(instance, self)
+
     # can be used as `default=`
     def __call__(self, *_, **__: typing.Any):
         return self.value
 
 
+class _Reference(typing.Generic[T]):
+    """Default of `reference_field`: computes a value out of other fields"""
+
+    def __init__(
+        self, fields: typing.Sequence[typing.Any], func: typing.Callable[..., T]
+    ):
+        self.fields = fields
+        self.func = func
+
+    def resolve(self, resolved: typing.Mapping[int, typing.Any]) -> T:
+        vars: typing.List[typing.Any] = []
+        for field in self.fields:
+            if isinstance(field, _Field):
+                vars.append(
+                    resolved[id(field)] if id(field) in resolved else field.value
+                )
+            else:
+                vars.append(field)
+
+        return self.func(*vars)
+
+    def __call__(self) -> T:
+        return self.resolve({})
+
+
+def _dependencies(field: _Field[typing.Any]) -> typing.List[_Field[typing.Any]]:
+    """Fields which must be resolved before this one"""
+    if isinstance(field.default, _Reference):
+        return [dep for dep in field.default.fields if isinstance(dep, _Field)]
+    if isinstance(field.default, _Field):
+        return [field.default]
+    return []
+
+
+class _ResolutionPlan(typing.NamedTuple):
+    """Fields of a config with their providers, worked out once per config (see `ConfigInner.plan`)"""
+
+    # (field, its provider, index in `groups` or -1 for fields without a name), dependencies first
+    steps: typing.Tuple[typing.Tuple[_Field[typing.Any], AbstractProvider, int], ...]
+    # names to fetch from every provider with a single `get_many`
+    groups: typing.Tuple[typing.Tuple[AbstractProvider, typing.Tuple[str, ...]], ...]
+    # `id(field)` -> its provider
+    providers: typing.Dict[int, AbstractProvider]
+
+
+def _plan(
+    order: typing.Iterable[typing.Tuple[_Field[typing.Any], AbstractProvider]],
+) -> _ResolutionPlan:
+    steps: typing.List[typing.Tuple[_Field[typing.Any], AbstractProvider, int]] = []
+    groups: typing.Dict[int, typing.Tuple[AbstractProvider, typing.List[str]]] = {}
+    for field, provider in order:
+        group = -1
+        if field.name is not None:
+            if id(provider) not in groups:
+                groups[id(provider)] = (provider, [])
+            groups[id(provider)][1].append(field.name)
+            group = list(groups).index(id(provider))
+        steps.append((field, provider, group))
+
+    return _ResolutionPlan(
+        steps=tuple(steps),
+        groups=tuple((provider, tuple(names)) for provider, names in groups.values()),
+        providers={id(field): provider for field, provider, _ in steps},
+    )
+
+
+_NOTHING_FOUND: typing.Mapping[str, typing.Any] = {}
+
+
+class _Timings(typing.NamedTuple):
+    """Filled by `_Resolution.resolve` when asked to, for observers (see `observe`)"""
+
+    # per group of the plan: values found and nanoseconds of the `get_many` call
+    found: typing.List[typing.Dict[str, typing.Any]]
+    lookup_ns: typing.List[int]
+    # per step of the plan: nanoseconds of casting the value or computing the default
+    cast_ns: typing.List[int]
+
+
+class _Resolution:
+    """State of a single config construction.
+    Shared `_Field`s are never modified: providers and defaults given to this very instance live here"""
+
+    def __init__(self, plan: _ResolutionPlan, defaults: typing.Dict[int, typing.Any]):
+        self.plan = plan
+        # keyed by `id(field)`
+        self.defaults = defaults
+        self.values: typing.Dict[int, typing.Any] = {}
+
+    def provider_of(self, field: _Field[typing.Any]) -> AbstractProvider:
+        return self.plan.providers.get(id(field)) or field.provider or DEFAULT_PROVIDER
+
+    def fetch_many(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Fetch values of all fields with one `get_many` call per provider, in the order of `plan.groups`"""
+        return [_get_many(provider, names) for provider, names in self.plan.groups]
+
+    def resolve_one(self, field: _Field[typing.Any]) -> typing.Any:
+        """Resolve a single field (with its dependencies) if it isn't resolved yet"""
+        values = self.values
+        if id(field) in values:
+            return values[id(field)]
+
+        for dependency in _dependencies(field):
+            self.resolve_one(dependency)
+
+        provider = self.provider_of(field)
+        found: typing.Mapping[str, typing.Any] = {}
+        if field.name is not None:
+            found = _get_many(provider, (field.name,))
+
+        default = self.defaults.get(id(field), field.default)
+        values[id(field)] = field._get_value_from(found, values, default, provider)
+        return values[id(field)]
+
+    def fetch_many_timed(self, timings: _Timings) -> typing.List[typing.Dict[str, typing.Any]]:
+        """`fetch_many` recording what every call found and how long it took"""
+        for provider, names in self.plan.groups:
+            start = perf_counter_ns()
+            timings.found.append(_get_many(provider, names))
+            timings.lookup_ns.append(perf_counter_ns() - start)
+        return timings.found
+
+    def resolve(self, timings: typing.Optional[_Timings] = None) -> None:
+        """Resolve all fields of the plan, each exactly once. Every step is timed into `timings` if given"""
+        found = self.fetch_many() if timings is None else self.fetch_many_timed(timings)
+        values = self.values
+        defaults = self.defaults
+        for field, provider, group in self.plan.steps:
+            provided = found[group] if group >= 0 else _NOTHING_FOUND
+            default = defaults.get(id(field), field.default) if defaults else field.default
+            if timings is None:
+                values[id(field)] = field._get_value_from(provided, values, default, provider)
+            else:
+                start = perf_counter_ns()
+                values[id(field)] = field._get_value_from(provided, values, default, provider)
+                timings.cast_ns.append(perf_counter_ns() - start)
+
+
 if typing.TYPE_CHECKING:
     Field = typing.Annotated[T, ...]
 else:
@@ -115,17 +358,7 @@ def field(
 
 
 def reference_field(*fields: *Ts, func: typing.Callable[[*Ts], T]) -> T:
-    def _default() -> T:
-        vars: typing.List[typing.Any] = []
-        for field in fields:
-            if isinstance(field, _Field):
-                vars.append(field.value)  # type: ignore
-            else:
-                vars.append(field)
-
-        return func(*vars)  # type: ignore
-
-    return typing.cast(T, _Field(default=_default))
+    return typing.cast(T, _Field(default=_Reference(fields, func)))
 
 
 def constant_field(const: T) -> T:
@@ -0,0 +1,91 @@
+import typing
+
+from betterconf.exceptions import FrozenConfigError
+from betterconf.provider import AbstractProvider
+
+if typing.TYPE_CHECKING:
+    from betterconf._config import ConfigProto
+
+CT = typing.TypeVar("CT", bound="ConfigProto")
+
+
+def _names(config: "ConfigProto") -> typing.List[str]:
+    inner = config.__bc_inner__
+    names = [info.name_in_python for info in inner.fields]
+    names += [sub_config.name for sub_config in inner.sub_configs]
+    return list(dict.fromkeys(names))
+
+
+def values_of(config: "ConfigProto") -> typing.Tuple[typing.Any, ...]:
+    return tuple(getattr(config, name) for name in _names(config))
+
+
+def freeze(config: "ConfigProto") -> None:
+    """Called at the end of a frozen config's `__init__`"""
+    try:
+        config_hash: typing.Optional[int] = hash(values_of(config))
+    except TypeError:
+        # some value (like a list) is unhashable, so is the config
+        config_hash = None
+    object.__setattr__(config, "__bc_hash__", config_hash)
+
+
+def frozen_setattr(self: "ConfigProto", name: str, value: typing.Any) -> None:
+    raise FrozenConfigError(self, name)
+
+
+def frozen_delattr(self: "ConfigProto", name: str) -> None:
+    raise FrozenConfigError(self, name)
+
+
+def frozen_hash(self: "ConfigProto") -> int:
+    config_hash: typing.Optional[int] = getattr(self, "__bc_hash__")
+    if config_hash is None:
+        raise TypeError(
+            f"unhashable config: {self.__class__.__name__} has unhashable values"
+        )
+    return config_hash
+
+
+def frozen_eq(self: "ConfigProto", other: typing.Any) -> bool:
+    if other.__class__ is not self.__class__:
+        return NotImplemented
+    if other is self:
+        return True
+    # hashes are computed anyway, so they are the cheapest way to say "different"
+    self_hash, other_hash = getattr(self, "__bc_hash__"), getattr(other, "__bc_hash__")
+    if self_hash is not None and other_hash is not None and self_hash != other_hash:
+        return False
+    return values_of(self) == values_of(other)
+
+
+def _share(new: "ConfigProto", old: "ConfigProto") -> None:
+    for sub_config in new.__bc_inner__.sub_configs:
+        new_sub = getattr(new, sub_config.name)
+        old_sub = getattr(old, sub_config.name, None)
+        if old_sub is None or not getattr(new_sub, "__bc_frozen__", False):
+            continue
+
+        if new_sub == old_sub:
+            object.__setattr__(new, sub_config.name, old_sub)
+        else:
+            _share(new_sub, old_sub)
+
+
+def reload(
+    config: CT,
+    _provider_: typing.Optional[AbstractProvider] = None,
+    **to_override: typing.Any,
+) -> CT:
+    """Construct the config again. For frozen configs, unchanged subconfigs are taken from the old one,
+    and if nothing has changed at all, the old config itself is returned"""
+    new = config.__class__(_provider_, **to_override)
+    if not getattr(config, "__bc_frozen__", False):
+        return new
+
+    if new == config:
+        return config
+
+    # subconfigs are part of the hash, but equal ones have equal hashes, so it's still valid
+    _share(new, config)
+    return new
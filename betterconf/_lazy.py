@@ -0,0 +1,77 @@
+import typing
+
+from betterconf._field import _PREFETCHED, _Field as Field, _Resolution  # type: ignore
+
+if typing.TYPE_CHECKING:
+    from betterconf._config import ConfigProto
+
+
+class LazyState:
+    """Everything a lazy config needs to resolve its fields later, stored in the instance as `__bc_lazy__`"""
+
+    __slots__ = ("resolution", "to_override", "prefetched")
+
+    def __init__(self, resolution: _Resolution, to_override: typing.Dict[str, typing.Any]):
+        self.resolution = resolution
+        self.to_override = to_override
+        # if the config is loaded with `aload`, the values are already there
+        self.prefetched = _PREFETCHED.get()
+
+    def load(self, instance: "ConfigProto", field: Field[typing.Any]) -> typing.Any:
+        token = _PREFETCHED.set(self.prefetched)
+        try:
+            value = self.resolution.resolve_one(field)
+        finally:
+            _PREFETCHED.reset(token)
+
+        # after that the attribute is a plain value in the instance
+        for name in instance.__bc_inner__.names_by_field.get(id(field), ()):
+            setattr(instance, name, value)
+        return value
+
+    def load_sub_config(
+        self,
+        instance: "ConfigProto",
+        name: str,
+        cfg: typing.Type["ConfigProto"],
+    ) -> typing.Any:
+        if name in self.to_override:
+            value = self.to_override[name]
+        else:
+            token = _PREFETCHED.set(self.prefetched)
+            try:
+                value = cfg(**self.to_override)
+            finally:
+                _PREFETCHED.reset(token)
+
+        setattr(instance, name, value)
+        return value
+
+
+class LazySubConfig:
+    """Replaces a subconfig in the lazy config's class, builds the subconfig on first access"""
+
+    def __init__(self, cfg: typing.Type["ConfigProto"], name: str):
+        self.cfg = cfg
+        self.name = name
+
+    def __get__(
+        self, instance: typing.Optional["ConfigProto"], owner: typing.Any = None
+    ) -> typing.Any:
+        state = getattr(instance, "__dict__", {}).get("__bc_lazy__")
+        if state is None:
+            return self.cfg
+
+        return state.load_sub_config(instance, self.name, self.cfg)
+
+
+def lazy_getattr(self: "ConfigProto", name: str) -> typing.Any:
+    # fields with a `Field` in the class are loaded by `_Field.__get__`, the rest (like `val: int`) get here
+    state: typing.Optional[LazyState] = self.__dict__.get("__bc_lazy__")
+    field = self.__bc_inner__.fields_by_name.get(name)
+    if state is None or field is None:
+        raise AttributeError(
+            f"'{self.__class__.__name__}' object has no attribute '{name}'"
+        )
+
+    return state.load(self, field)
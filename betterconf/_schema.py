@@ -0,0 +1,180 @@
+"""
+Schemas of config classes kept on disk, so later processes don't evaluate their annotations again.
+"""
+
+import os
+import sys
+import atexit
+import threading
+import typing
+
+# json, hashlib and pathlib are imported once the cache is enabled, it's off by default
+if typing.TYPE_CHECKING:
+    from pathlib import Path
+
+# how an annotated field is parsed: the kind (see `_config._spec_of`) and the name of its builtin type
+Spec = typing.Tuple[str, typing.Optional[str]]
+Schema = typing.Dict[str, Spec]
+
+_directory: typing.Optional["Path"] = None
+_lock = threading.Lock()
+# module name -> contents of its cache file
+_files: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+# modules with schemas not written yet
+_dirty: typing.Set[str] = set()
+# source path -> ((mtime, size), sha256 of the source)
+_digests: typing.Dict[str, typing.Tuple[typing.Tuple[int, int], str]] = {}
+
+
+def enable_schema_cache(directory: typing.Union[str, "Path"]) -> None:
+    """Keep schemas of config classes in `directory`. Configs decorated afterwards are parsed from it when
+    the sources of their modules (and the modules of their bases) and the Python version haven't changed"""
+    global _directory
+    from pathlib import Path
+
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    _flush()
+    with _lock:
+        _directory = path
+        _files.clear()
+
+
+def disable_schema_cache() -> None:
+    global _directory
+    _flush()
+    with _lock:
+        _directory = None
+        _files.clear()
+
+
+def _source_digest(module_name: str) -> typing.Optional[str]:
+    import hashlib
+
+    path = getattr(sys.modules.get(module_name), "__file__", None)
+    if not path or not path.endswith(".py"):
+        return None
+
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cached = _digests.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        with open(path, mode="rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+    _digests[path] = (stamp, digest)
+    return digest
+
+
+def _key(cfg: type) -> typing.Optional[str]:
+    """Changes with the sources of all modules defining the class and its bases"""
+    import hashlib
+    import json
+
+    if "<locals>" in cfg.__qualname__:
+        # classes defined in functions share their qualnames
+        return None
+
+    digests: typing.Dict[str, str] = {}
+    for klass in cfg.__mro__[:-1]:
+        if klass.__module__ in digests:
+            continue
+        digest = _source_digest(klass.__module__)
+        if digest is None:
+            return None
+        digests[klass.__module__] = digest
+
+    return hashlib.sha256(json.dumps(sorted(digests.items())).encode()).hexdigest()
+
+
+def _file_of(module_name: str) -> "Path":
+    assert _directory is not None
+    return _directory / f"{module_name}.{sys.implementation.cache_tag}.json"
+
+
+def _entries(module_name: str) -> typing.Dict[str, typing.Any]:
+    import json
+
+    entries = _files.get(module_name)
+    if entries is None:
+        try:
+            with open(_file_of(module_name), encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        if not isinstance(entries, dict):
+            entries = {}
+        _files[module_name] = entries
+    return entries
+
+
+def load(cfg: type) -> typing.Optional[Schema]:
+    """The stored schema of `cfg`, None if there's none or it's stale"""
+    if _directory is None:
+        return None
+
+    with _lock:
+        key = _key(cfg)
+        if key is None:
+            return None
+
+        entry = _entries(cfg.__module__).get(cfg.__qualname__)
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        try:
+            return {name: (kind, type_name) for name, kind, type_name in entry["fields"]}
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def store(cfg: type, schema: Schema) -> None:
+    if _directory is None:
+        return
+
+    with _lock:
+        key = _key(cfg)
+        if key is None:
+            return
+
+        _entries(cfg.__module__)[cfg.__qualname__] = {
+            "key": key,
+            "fields": [[name, kind, type_name] for name, (kind, type_name) in schema.items()],
+        }
+        # a module is written once, not after every class of it
+        _dirty.add(cfg.__module__)
+
+
+def _flush() -> None:
+    """Write the schemas stored since the last flush, called at exit"""
+    with _lock:
+        if _directory is None:
+            _dirty.clear()
+            return
+
+        import json
+
+        for module_name in sorted(_dirty):
+            # the cache only speeds things up, a file which can't be written is left as is
+            path = _file_of(module_name)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp, mode="w", encoding="utf-8") as f:
+                    json.dump(_files[module_name], f)
+                os.replace(tmp, path)
+            except OSError:
+                pass
+        _dirty.clear()
+
+
+atexit.register(_flush)
+
+if os.environ.get("BETTERCONF_SCHEMA_CACHE"):
+    enable_schema_cache(os.environ["BETTERCONF_SCHEMA_CACHE"])
+
+
+__all__ = ("enable_schema_cache", "disable_schema_cache")
@@ -1,35 +1,56 @@
 import typing
-import logging
 
 from betterconf.exceptions import ImpossibleToCastError
 
 VT = typing.TypeVar("VT")
 
+_NOT_FOUND = object()
+
 
 class AbstractCaster:
     def cast(self, val: str) -> typing.Union[typing.Any, typing.NoReturn]:
         """Try to cast or return val"""
         raise NotImplementedError()
 
+    def cast_typed(self, val: typing.Any) -> typing.Any:
+        """Cast a value a provider has returned already typed (see `AbstractProvider.get_typed`).
+        Return `NotImplemented` to get it as a str in `cast` instead"""
+        return NotImplemented
+
 
 class ConstantCaster(AbstractCaster, typing.Generic[VT]):
     ABLE_TO_CAST: typing.Dict[
         typing.Union[str, typing.Tuple[str, ...]], typing.Any
     ] = {}
+    # ABLE_TO_CAST flattened: every key (tuples unpacked) lowercased
+    _lookup: typing.Dict[str, typing.Any] = {}
+
+    @staticmethod
+    def _build_lookup(
+        able_to_cast: typing.Dict[typing.Union[str, typing.Tuple[str, ...]], typing.Any],
+    ) -> typing.Dict[str, typing.Any]:
+        lookup: typing.Dict[str, typing.Any] = {}
+        for key, converted in able_to_cast.items():
+            for k in key if isinstance(key, tuple) else (key,):
+                # the first key wins, as it did when ABLE_TO_CAST was searched in order
+                lookup.setdefault(k.lower(), converted)
+        return lookup
+
+    def __init_subclass__(cls, **kwargs: typing.Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._lookup = cls._build_lookup(cls.ABLE_TO_CAST)
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        super().__setattr__(name, value)
+        if name == "ABLE_TO_CAST":
+            super().__setattr__("_lookup", self._build_lookup(value))
 
     def cast(self, val: str) -> typing.Union[VT, typing.NoReturn]:
         """Cast using ABLE_TO_CAST dictionary as in BoolCaster"""
-        if val in self.ABLE_TO_CAST:
-            converted = self.ABLE_TO_CAST.get(val.lower())
-            converted = typing.cast(VT, converted)
-            return converted
-        else:
-            for key in self.ABLE_TO_CAST:
-                if isinstance(key, tuple) and val.lower() in key:
-                    return self.ABLE_TO_CAST[key]
-                elif isinstance(key, str) and val.lower() == key:
-                    return self.ABLE_TO_CAST[key]
+        converted = self._lookup.get(val.lower(), _NOT_FOUND)
+        if converted is _NOT_FOUND:
             raise ImpossibleToCastError(val, self)
+        return typing.cast(VT, converted)
 
 
 class BoolCaster(ConstantCaster[bool]):
@@ -45,6 +66,9 @@ class BoolCaster(ConstantCaster[bool]):
         "off": False,
     }
 
+    def cast_typed(self, val: typing.Any) -> typing.Any:
+        return val if isinstance(val, bool) else NotImplemented
+
 
 class IntCaster(AbstractCaster):
     def cast(self, val: str) -> typing.Union[int, typing.NoReturn]:
@@ -54,6 +78,11 @@ class IntCaster(AbstractCaster):
         except ValueError:
             raise ImpossibleToCastError(val, self)
 
+    def cast_typed(self, val: typing.Any) -> typing.Any:
+        if isinstance(val, int) and not isinstance(val, bool):
+            return val
+        return NotImplemented
+
 
 class FloatCaster(AbstractCaster):
     def cast(self, val: str) -> typing.Union[float, typing.NoReturn]:
@@ -64,6 +93,11 @@ class FloatCaster(AbstractCaster):
         except ValueError:
             raise ImpossibleToCastError(val, self)
 
+    def cast_typed(self, val: typing.Any) -> typing.Any:
+        if isinstance(val, (int, float)) and not isinstance(val, bool):
+            return float(val)
+        return NotImplemented
+
 
 class ListCaster(AbstractCaster):
     def __init__(self, separator: str = ","):
@@ -74,17 +108,22 @@ class ListCaster(AbstractCaster):
             val = val[0 : len(val) - len(self.separator)]
         return val.split(self.separator)
 
+    def cast_typed(self, val: typing.Any) -> typing.Any:
+        # a copy, as providers may share the value
+        return list(val) if isinstance(val, (list, tuple)) else NotImplemented
+
 
 class LoggingLogLevelCaster(ConstantCaster[int]):
+    # values of `logging.CRITICAL` and so on, `logging` itself is too heavy to import just for them
     ABLE_TO_CAST = {
-        "CRITICAL": logging.CRITICAL,
-        "FATAL": logging.FATAL,
-        "ERROR": logging.ERROR,
-        "WARN": logging.WARN,
-        "WARNING": logging.WARNING,
-        "INFO": logging.INFO,
-        "DEBUG": logging.DEBUG,
-        "NOTSET": logging.NOTSET,
+        "CRITICAL": 50,
+        "FATAL": 50,
+        "ERROR": 40,
+        "WARN": 30,
+        "WARNING": 30,
+        "INFO": 20,
+        "DEBUG": 10,
+        "NOTSET": 0,
     }
 
 
@@ -1,16 +1,45 @@
 import typing
 from betterconf.provider import AbstractProvider, DEFAULT_PROVIDER
 from betterconf._config import ConfigInner, ConfigProto, Prefix
+from betterconf._compiled import compile_plan, load
+from betterconf._lazy import LazyState, LazySubConfig, lazy_getattr
+from betterconf import _frozen, observe
+from betterconf.exceptions import BetterconfError
 
 class_T = typing.TypeVar("class_T", bound=type)
 
 
+def _slotted(cls: class_T) -> class_T:
+    """Recreate the config class with `__slots__` for all its fields and subconfigs.
+    Fields and subconfigs are only kept in `__bc_inner__` then, as slots take their names in the class"""
+    names = [info.name_in_python for info in cls.__bc_inner__.fields]
+    names += [sub_config.name for sub_config in cls.__bc_inner__.sub_configs]
+    names = list(dict.fromkeys(names))
+
+    cls_dict = dict(cls.__dict__)
+    # values of the class body, for subclasses parsing the fields again (see `_config._class_value`)
+    cls_dict["__bc_body__"] = {name: cls_dict[name] for name in names if name in cls_dict}
+    for name in names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    if cls.__bc_frozen__:
+        names.append("__bc_hash__")
+    cls_dict["__slots__"] = tuple(names)
+
+    return typing.cast(class_T, type(cls)(cls.__name__, cls.__bases__, cls_dict))
+
+
 @typing.overload
 def betterconf(
     cls: class_T,
     provider: typing.Optional[AbstractProvider] = None,
     prefix: typing.Optional[typing.Union[Prefix, str]] = None,
     subconfig: bool = False,
+    compiled: bool = False,
+    lazy: bool = False,
+    slots: bool = False,
+    frozen: bool = False,
 ) -> class_T: ...
 
 
@@ -20,6 +49,10 @@ def betterconf(
     provider: typing.Optional[AbstractProvider] = None,
     prefix: typing.Optional[typing.Union[Prefix, str]] = None,
     subconfig: bool = False,
+    compiled: bool = False,
+    lazy: bool = False,
+    slots: bool = False,
+    frozen: bool = False,
 ) -> typing.Callable[[class_T], class_T]: ...
 
 
@@ -28,6 +61,10 @@ def betterconf(
     provider: typing.Optional[AbstractProvider] = None,
     prefix: typing.Optional[typing.Union[Prefix, str]] = None,
     subconfig: bool = False,
+    compiled: bool = False,
+    lazy: bool = False,
+    slots: bool = False,
+    frozen: bool = False,
 ) -> typing.Union[class_T, typing.Callable[[class_T], class_T]]:
     def inner(cls: class_T) -> class_T:
         def __init__(
@@ -35,31 +72,62 @@ def betterconf(
             _provider_: typing.Optional[AbstractProvider] = None,
             **to_override: typing.Any,
         ):
+            resolution = self.__bc_inner__.resolution(provider, _provider_, to_override)
+            observer = observe._observer
+            if observer is None:
+                resolution.resolve()
+            else:
+                observe._resolve(self, resolution, observer)
+
+            # `object.__setattr__`, because frozen configs forbid `setattr`
             for field in self.__bc_inner__.fields:
-                if not field.field.provider:
-                    field.field.provider = provider
-
-                if _provider_:
-                    field.field.provider = _provider_
-
-                if field.name_in_python in to_override:
-                    field.field.default = to_override[field.name_in_python]
-                    setattr(self, field.name_in_python, field.field.value)
-                else:
-                    setattr(self, field.name_in_python, field.field.value)
+                value = resolution.values[id(field.field)]
+                object.__setattr__(self, field.name_in_python, value)
 
             for sub_config in self.__bc_inner__.sub_configs:
-                if not sub_config.cfg.__bc_provider__:
-                    sub_config.cfg.__bc_provider__ = provider
-
-                if _provider_:
-                    sub_config.cfg.__bc_provider__ = _provider_
-
                 if sub_config.name in to_override:
-                    setattr(self, sub_config.name, to_override[sub_config.name])
+                    value = to_override[sub_config.name]
+                    object.__setattr__(self, sub_config.name, value)
                 else:
                     config = sub_config.cfg(**to_override)
-                    setattr(self, sub_config.name, config)
+                    object.__setattr__(self, sub_config.name, config)
+
+        def __lazy_init__(
+            self: ConfigProto,
+            _provider_: typing.Optional[AbstractProvider] = None,
+            **to_override: typing.Any,
+        ):
+            resolution = self.__bc_inner__.resolution(provider, _provider_, to_override)
+            setattr(self, "__bc_lazy__", LazyState(resolution, to_override))
+
+        def __compiled_init__(
+            self: ConfigProto,
+            _provider_: typing.Optional[AbstractProvider] = None,
+            **to_override: typing.Any,
+        ):
+            if observe._observer is not None:
+                # the plan resolves all fields in one go, observed configs go field by field
+                __init__(self, _provider_, **to_override)
+                return
+
+            load(self, self.__bc_plan__, _provider_, to_override)  # type: ignore
+
+        async def aload(
+            cls: typing.Type[ConfigProto],
+            _provider_: typing.Optional[AbstractProvider] = None,
+            **to_override: typing.Any,
+        ) -> ConfigProto:
+            # asyncio is imported only by the configs loaded asynchronously
+            from betterconf._async import aload as _aload
+
+            return await _aload(cls, _provider_, to_override)
+
+        if compiled and lazy:
+            raise BetterconfError("A config can't be compiled and lazy at once")
+        if slots and lazy:
+            raise BetterconfError("Lazy configs keep their values in `__dict__`, so they can't have slots")
+        if frozen and lazy:
+            raise BetterconfError("Frozen configs are hashed by all their values, so they can't be lazy")
 
         nonlocal provider
         if subconfig is False:
@@ -71,11 +139,48 @@ def betterconf(
 
         cls.__bc_subconfig__ = subconfig
         cls.__bc_inner__ = ConfigInner.parse_into(cls, provider, prefix)
+        if frozen:
+            for sub_config in cls.__bc_inner__.sub_configs:
+                if not getattr(sub_config.cfg, "__bc_frozen__", False):
+                    raise BetterconfError(
+                        f"Subconfig '{sub_config.name}' of a frozen config must be frozen too, "
+                        "otherwise the config can still be changed through it and isn't hashed by its values"
+                    )
         cls.__bc_prefix__ = prefix
         cls.__bc_provider__ = provider
-
-        setattr(cls, "__init__", __init__)
-        return cls
+        cls.__bc_compiled__ = compiled
+        cls.__bc_slots__ = slots
+        cls.__bc_frozen__ = frozen
+        cls.__bc_plan__ = compile_plan(cls) if compiled else None
+
+        if compiled:
+            setattr(cls, "__init__", __compiled_init__)
+        elif lazy:
+            setattr(cls, "__init__", __lazy_init__)
+            setattr(cls, "__getattr__", lazy_getattr)
+            for sub_config in cls.__bc_inner__.sub_configs:
+                setattr(cls, sub_config.name, LazySubConfig(sub_config.cfg, sub_config.name))
+        else:
+            setattr(cls, "__init__", __init__)
+
+        if frozen:
+            init = cls.__init__
+
+            def __frozen_init__(
+                self: ConfigProto,
+                _provider_: typing.Optional[AbstractProvider] = None,
+                **to_override: typing.Any,
+            ):
+                init(self, _provider_, **to_override)
+                _frozen.freeze(self)
+
+            setattr(cls, "__init__", __frozen_init__)
+            setattr(cls, "__setattr__", _frozen.frozen_setattr)
+            setattr(cls, "__delattr__", _frozen.frozen_delattr)
+            setattr(cls, "__hash__", _frozen.frozen_hash)
+            setattr(cls, "__eq__", _frozen.frozen_eq)
+        setattr(cls, "aload", classmethod(aload))
+        return _slotted(cls) if slots else cls
 
     if cls is None:
         return inner
@@ -21,3 +21,10 @@ class VariableNotFoundError(BetterconfError):
         self.variable_name = variable_name
         self.message = f"Variable ({variable_name}) hasn't been found"
         super().__init__(self.message)
+
+
+class FrozenConfigError(BetterconfError, AttributeError):
+    def __init__(self, config: object, name: str):
+        self.name = name
+        self.message = f"Cannot assign to field '{name}' of frozen config {config.__class__.__name__}"
+        super().__init__(self.message)
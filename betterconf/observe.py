@@ -0,0 +1,181 @@
+"""
+Observing config constructions: how long every field takes and how often every provider is called.
+"""
+
+import sys
+import threading
+import time
+import typing
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from betterconf._field import _MISSING, _PREFETCHED, _Resolution, _Timings  # type: ignore
+from betterconf.provider import AbstractProvider
+
+if typing.TYPE_CHECKING:
+    from betterconf._config import ConfigProto
+
+
+@dataclass(frozen=True)
+class FieldReport:
+    # name in the config, None for the fields which are only referenced by the config ones
+    name: typing.Optional[str]
+    # name in the provider
+    key: typing.Optional[str]
+    provider: AbstractProvider
+    # share of the provider call fetching the value: fields fetched together split its time evenly
+    lookup_ns: int
+    # casting the value, or computing the default when it's used
+    cast_ns: int
+    default_used: bool
+
+
+@dataclass(frozen=True)
+class ConstructionReport:
+    config: type
+    # in resolution order, dependencies first
+    fields: typing.Tuple[FieldReport, ...]
+    # calls of `get_many` by provider; values fetched ahead by `Config.aload` aren't counted
+    provider_calls: typing.Dict[AbstractProvider, int]
+    total_ns: int
+
+
+class Observer:
+    """Gets a report of every config construction once set with `set_observer`.
+    Subconfigs are reported on their own, lazy configs aren't reported at all"""
+
+    def on_construction(self, report: ConstructionReport) -> None:
+        pass
+
+
+# None is the default: constructions aren't timed at all then
+_observer: typing.Optional[Observer] = None
+
+
+def set_observer(observer: typing.Optional[Observer]) -> typing.Optional[Observer]:
+    """Observe all constructions from now on, None turns observing off. Returns the previous observer"""
+    global _observer
+    previous, _observer = _observer, observer
+    return previous
+
+
+@contextmanager
+def observing(observer: Observer) -> typing.Iterator[Observer]:
+    previous = set_observer(observer)
+    try:
+        yield observer
+    finally:
+        set_observer(previous)
+
+
+def _resolve(config: "ConfigProto", resolution: _Resolution, observer: Observer) -> None:
+    """`_Resolution.resolve` with its timings reported to `observer`"""
+    started = time.perf_counter_ns()
+    timings = _Timings([], [], [])
+    resolution.resolve(timings)
+    total_ns = time.perf_counter_ns() - started
+
+    plan = resolution.plan
+    prefetched = _PREFETCHED.get() or {}
+    calls: typing.Dict[AbstractProvider, int] = {}
+    for provider, _ in plan.groups:
+        if id(provider) not in prefetched:
+            calls[provider] = calls.get(provider, 0) + 1
+
+    names = config.__bc_inner__.names_by_field
+    fields: typing.List[FieldReport] = []
+    for (field, provider, group), cast_ns in zip(plan.steps, timings.cast_ns):
+        found = timings.found[group] if group >= 0 else {}
+        fields.append(
+            FieldReport(
+                name=names[id(field)][0] if id(field) in names else None,
+                key=field.name,
+                provider=provider,
+                lookup_ns=timings.lookup_ns[group] // len(plan.groups[group][1]) if group >= 0 else 0,
+                cast_ns=cast_ns,
+                default_used=found.get(field.name, _MISSING) is _MISSING if group >= 0 else True,
+            )
+        )
+
+    observer.on_construction(
+        ConstructionReport(
+            config=config.__class__,
+            fields=tuple(fields),
+            provider_calls=calls,
+            total_ns=total_ns,
+        )
+    )
+
+
+@dataclass
+class FieldStats:
+    constructions: int = 0
+    lookup_ns: int = 0
+    cast_ns: int = 0
+    defaults_used: int = 0
+
+    @property
+    def total_ns(self) -> int:
+        return self.lookup_ns + self.cast_ns
+
+
+class SlowestFields(Observer):
+    """Sums up the reports to tell which fields take the most time over all constructions"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.constructions = 0
+        # "Config.field" -> its stats
+        self.fields: typing.Dict[str, FieldStats] = {}
+        # provider class name -> calls
+        self.provider_calls: typing.Dict[str, int] = {}
+
+    def on_construction(self, report: ConstructionReport) -> None:
+        # configs defined in functions are named without the function
+        config_name = report.config.__qualname__.rsplit("<locals>.", 1)[-1]
+        with self._lock:
+            self.constructions += 1
+            for field in report.fields:
+                stats = self.fields.setdefault(f"{config_name}.{field.name or field.key}", FieldStats())
+                stats.constructions += 1
+                stats.lookup_ns += field.lookup_ns
+                stats.cast_ns += field.cast_ns
+                stats.defaults_used += field.default_used
+
+            for provider, calls in report.provider_calls.items():
+                name = provider.__class__.__name__
+                self.provider_calls[name] = self.provider_calls.get(name, 0) + calls
+
+    def top(self, n: int = 10) -> typing.List[typing.Tuple[str, FieldStats]]:
+        with self._lock:
+            return sorted(self.fields.items(), key=lambda item: item[1].total_ns, reverse=True)[:n]
+
+    def report(self, n: int = 10) -> str:
+        lines = [
+            f"{self.constructions} constructions, the {n} slowest fields (total time in us):",
+            f"{'field':<40} {'total':>10} {'lookup':>10} {'cast':>10} {'defaults':>9}",
+        ]
+        for name, stats in self.top(n):
+            lines.append(
+                f"{name:<40} {stats.total_ns / 1000:>10.1f} {stats.lookup_ns / 1000:>10.1f} "
+                f"{stats.cast_ns / 1000:>10.1f} {stats.defaults_used:>4}/{stats.constructions:<4}"
+            )
+
+        with self._lock:
+            calls = sorted(self.provider_calls.items(), key=lambda item: item[1], reverse=True)
+        lines.append("provider calls: " + ", ".join(f"{name} {count}" for name, count in calls))
+        return "\n".join(lines)
+
+    def print_report(self, n: int = 10, file: typing.Optional[typing.TextIO] = None) -> None:
+        print(self.report(n), file=file or sys.stdout)
+
+
+__all__ = (
+    "Observer",
+    "ConstructionReport",
+    "FieldReport",
+    "FieldStats",
+    "SlowestFields",
+    "set_observer",
+    "observing",
+)
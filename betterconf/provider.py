@@ -1,93 +1,674 @@
 import os
-import json
+import re
 import typing
 
-from pathlib import Path
+# json, tomllib, datetime, asyncio and pathlib are imported where they're used, so `import betterconf` doesn't pay for them
+if typing.TYPE_CHECKING:
+    from pathlib import Path
+
+from types import MappingProxyType
+from betterconf._cache import SOURCE_CACHE
 from betterconf.exceptions import BetterconfError, VariableNotFoundError
 
+_MISSING = object()
+
 
 class AbstractProvider:
     """Implement this class and pass to `field`"""
 
+    # True when `lookup` and `get_many` of the class read values on their own, not through `get`.
+    # A subclass overriding `get` turns it off, so its `get` is still called for every value
+    _bulk: typing.ClassVar[bool] = False
+
+    def __init_subclass__(cls, **kwargs: typing.Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "get" in cls.__dict__ and "_bulk" not in cls.__dict__:
+            cls._bulk = False
+
     def get(self, name: str) -> str:
         """Return a value (str) or raise a `VariableNotFoundError`"""
         raise NotImplementedError()
 
+    def lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        """Return a value (as `get_typed` does) or `missing`.
+        Override it if your provider can tell a value is missing without raising"""
+        try:
+            return self.get_typed(name)
+        except VariableNotFoundError:
+            return missing
+
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        """Return values for all found names, missing ones are just left out.
+        Override it if your provider can fetch many values at once"""
+        found: typing.Dict[str, str] = {}
+        for name in names:
+            value = self.lookup(name, _MISSING)
+            if value is not _MISSING:
+                found[name] = self.to_str(value)
+        return found
+
+    def get_typed(self, name: str) -> typing.Any:
+        """Like `get`, but the value may be returned already typed (a bool, a list...) if the source has types.
+        Casters take such values as they are (see `AbstractCaster.cast_typed`) or get them as `to_str(value)`"""
+        return self.get(name)
+
+    def get_many_typed(self, names: typing.Iterable[str]) -> typing.Dict[str, typing.Any]:
+        """`get_many` with values typed as in `get_typed`"""
+        return self.get_many(names)
+
+    def to_str(self, value: typing.Any) -> str:
+        """A value from `get_typed` as `get` would return it"""
+        return str(value)
+
+    def sources(self) -> typing.Sequence["Path"]:
+        """Files the values are read from, so they can be watched for changes (see `betterconf.watch`)"""
+        return ()
+
+    def reload(self) -> None:
+        """Read the values from `sources()` again"""
+
+
+class AsyncAbstractProvider(AbstractProvider):
+    """Implement this class if your provider has to await values.
+    Configs using it are constructed with `await Config.aload()`"""
+
+    async def get(self, name: str) -> str:  # type: ignore[override]
+        """Return a value (str) or raise a `VariableNotFoundError`"""
+        raise NotImplementedError()
+
+    async def get_many(  # type: ignore[override]
+        self, names: typing.Iterable[str]
+    ) -> typing.Dict[str, str]:
+        """Return values for all found names, missing ones are just left out.
+        By default calls `get` for all names concurrently"""
+        import asyncio
+
+        names = list(names)
+        results = await asyncio.gather(
+            *(self.get(name) for name in names), return_exceptions=True
+        )
+
+        found: typing.Dict[str, str] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, VariableNotFoundError):
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            found[name] = result
+        return found
+
+    async def get_typed(self, name: str) -> typing.Any:  # type: ignore[override]
+        return await self.get(name)
+
+    async def get_many_typed(  # type: ignore[override]
+        self, names: typing.Iterable[str]
+    ) -> typing.Dict[str, typing.Any]:
+        return await self.get_many(names)
+
+
+class AsyncMemoryProvider(AsyncAbstractProvider):
+    """Async provider serving values from a dict. Handy for tests"""
+
+    def __init__(self, values: typing.Mapping[str, str]) -> None:
+        self._values = dict(values)
+
+    async def get(self, name: str) -> str:
+        value = self._values.get(name)
+        if value is None:
+            raise VariableNotFoundError(name)
+        return value
+
+    async def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        values = self._values
+        return {name: values[name] for name in names if name in values}
+
+
+class SnapshotProvider(AbstractProvider):
+    """Serves values from an immutable copy of the source, taken once and then on every `refresh()`.
+    The source is `os.environ` by default, it also may be a mapping or a provider with the names to take"""
+
+    def __init__(
+        self,
+        source: typing.Union[AbstractProvider, typing.Mapping[str, str], None] = None,
+        names: typing.Optional[typing.Iterable[str]] = None,
+    ) -> None:
+        if isinstance(source, AbstractProvider) and names is None:
+            raise BetterconfError(
+                "SnapshotProvider needs names to take from a provider"
+            )
+
+        self._source = source
+        self._names = tuple(names) if names is not None else None
+        self._values: typing.Mapping[str, str] = MappingProxyType({})
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Take a new copy of the source"""
+        if self._source is None:
+            values = dict(os.environ)
+        elif isinstance(self._source, AbstractProvider):
+            values = self._source.get_many(self._names)  # type: ignore
+        else:
+            values = dict(self._source)
+        self._values = MappingProxyType(values)
+
+    @property
+    def values(self) -> typing.Mapping[str, str]:
+        return self._values
+
+    def get(self, name: str) -> str:
+        value = self._values.get(name)
+        if value is None:
+            raise VariableNotFoundError(name)
+        return value
+
+    def lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        return self._values.get(name, missing)
+
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        values = self._values
+        return {name: values[name] for name in names if name in values}
+
+
+class LayeredProvider(AbstractProvider):
+    """Looks values up in layers, the first layer having a value wins: `LayeredProvider(cli, env, dotenv, defaults)`.
+    Layers are providers or mappings. Every name is resolved through the layers once and then it's a single
+    dict lookup, until `reload()` reloads the layers and resolves names again"""
+
+    def __init__(
+        self, *layers: typing.Union[AbstractProvider, typing.Mapping[str, typing.Any]]
+    ) -> None:
+        if not layers:
+            raise BetterconfError("LayeredProvider needs at least one layer")
+
+        self.layers: typing.Tuple[AbstractProvider, ...] = tuple(
+            layer if isinstance(layer, AbstractProvider) else SnapshotProvider(layer)
+            for layer in layers
+        )
+        for layer in self.layers:
+            if isinstance(layer, AsyncAbstractProvider):
+                raise BetterconfError(
+                    f"{layer.__class__.__name__} is async, it can't be a layer"
+                )
+
+        # name -> (value, index of the layer), -1 for the names no layer has
+        self._index: typing.Dict[str, typing.Tuple[typing.Any, int]] = {}
+        # typed values are turned into strs by their own layers, see `to_str`
+        self._layer_of_value: typing.Dict[int, AbstractProvider] = {}
+
+    def _resolve(self, names: typing.Iterable[str]) -> typing.Dict[str, typing.Tuple[typing.Any, int]]:
+        index = self._index
+        missing = [name for name in names if name not in index]
+        for i, layer in enumerate(self.layers):
+            if not missing:
+                break
+
+            found = layer.get_many_typed(missing)
+            for name, value in found.items():
+                index[name] = (value, i)
+                if not isinstance(value, str):
+                    self._layer_of_value[id(value)] = layer
+            missing = [name for name in missing if name not in found]
+
+        for name in missing:
+            index[name] = (None, -1)
+        return index
+
+    def source_of(self, name: str) -> typing.Optional[AbstractProvider]:
+        """The layer the value comes from, None if no layer has it"""
+        _, layer = self._resolve((name,))[name]
+        return self.layers[layer] if layer >= 0 else None
+
+    def get_typed(self, name: str) -> typing.Any:
+        value, layer = self._resolve((name,))[name]
+        if layer < 0:
+            raise VariableNotFoundError(name)
+        return value
+
+    def lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        value, layer = self._resolve((name,))[name]
+        return value if layer >= 0 else missing
+
+    def get_many_typed(self, names: typing.Iterable[str]) -> typing.Dict[str, typing.Any]:
+        names = tuple(names)
+        index = self._resolve(names)
+        found: typing.Dict[str, typing.Any] = {}
+        for name in names:
+            value, layer = index[name]
+            if layer >= 0:
+                found[name] = value
+        return found
+
+    def get(self, name: str) -> str:
+        return self.to_str(self.get_typed(name))
+
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        to_str = self.to_str
+        return {name: to_str(value) for name, value in self.get_many_typed(names).items()}
+
+    def to_str(self, value: typing.Any) -> str:
+        if isinstance(value, str):
+            return value
+        layer = self._layer_of_value.get(id(value))
+        return str(value) if layer is None else layer.to_str(value)
+
+    def sources(self) -> typing.Sequence["Path"]:
+        return tuple(path for layer in self.layers for path in layer.sources())
+
+    def reload(self) -> None:
+        for layer in self.layers:
+            layer.reload()
+        self._index = {}
+        self._layer_of_value = {}
+
 
 class EnvironmentProvider(AbstractProvider):
     """Default provider. Gets vals from environment"""
 
+    _bulk = True
+    _snapshot: typing.Optional[SnapshotProvider] = None
+
+    def freeze(self) -> SnapshotProvider:
+        """Serve values from a snapshot of the environment taken now, `refresh()` the returned snapshot
+        to see new changes. `DEFAULT_PROVIDER.freeze()` does it for all configs without their own provider"""
+        self._snapshot = SnapshotProvider()
+        return self._snapshot
+
+    def unfreeze(self) -> None:
+        self._snapshot = None
+
     def get(self, name: str) -> str:
+        if self._snapshot is not None:
+            return self._snapshot.get(name)
+
         value = os.getenv(name)
         if value is None:
             raise VariableNotFoundError(name)
         return value
 
+    def lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        if not self._bulk:
+            return super().lookup(name, missing)
+        if self._snapshot is not None:
+            return self._snapshot.lookup(name, missing)
 
-class JSONProvider(AbstractProvider):
-    @staticmethod
-    def __bool_object_hook(inp: typing.Any) -> typing.Dict[typing.Any, typing.Any]:
-        d: typing.Dict[typing.Any, typing.Any] = {}
-        for k, v in inp.items():
-            if isinstance(v, bool):
-                d[k] = str(v)
-                continue
-            elif isinstance(v, list):
-                d[k] = json.dumps(v)
-                continue
-            d[k] = v
-        return d
-
-    def __init__(self, inp: str, nested_access: str = "."):
-        # dirty hack cause betterconf itself deserializes objects and we have to implement clear interface based on
-        # str`s
-        self._content: typing.Union[typing.Any, typing.Dict[str, typing.Any]] = (
-            json.loads(
-                inp,
-                object_hook=self.__bool_object_hook,
-                parse_int=lambda i: i,
-                parse_float=lambda f: f,
-                parse_constant=lambda c: c,
-            )
-        )
+        return os.environ.get(name, missing)
+
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        if not self._bulk:
+            return super().get_many(names)
+        if self._snapshot is not None:
+            return self._snapshot.get_many(names)
+
+        # a single lookup per name: `in` and `[]` would encode every key twice
+        get = os.environ.get
+        found: typing.Dict[str, str] = {}
+        for name in names:
+            value = get(name)
+            if value is not None:
+                found[name] = value
+        return found
+
+
+class _DocumentProvider(AbstractProvider):
+    """Values of a structured document, nested ones are accessed like `a.b.c`.
+    The document is decoded once, its top-level subtrees are indexed (if `flatten`) and turned into strs
+    only when something from them is requested"""
+
+    # tells documents of different formats apart in `SOURCE_CACHE`
+    _format: typing.ClassVar[str]
+    _bulk = True
+
+    def __init__(self, inp: str, nested_access: str = ".", *, flatten: bool = True):
+        self._setup(nested_access, flatten)
+        self._document = self._parse(inp, nested_access, flatten)
+
+    def _setup(self, nested_access: str, flatten: bool) -> None:
         self._nested_access = nested_access
-        if not isinstance(self._content, dict):
-            raise ValueError("JSONProvider doesn't know how to operate not on dicts")
+        self._flatten = flatten
+        self._path: typing.Optional["Path"] = None
+
+    @classmethod
+    def _decode(cls, inp: str | bytes) -> typing.Any:
+        raise NotImplementedError()
+
+    @classmethod
+    def _parse(cls, inp: str | bytes, nested_access: str, flatten: bool) -> "_Document":
+        content = cls._decode(inp)
+        if not isinstance(content, dict):
+            raise ValueError(f"{cls.__name__} doesn't know how to operate not on dicts")
+
+        return _Document(content, nested_access, flatten)
 
     @classmethod
-    def from_path(cls, path: str, nested_access: str = ".") -> typing.Self:
-        return cls.from_file(open(path, mode="r"), nested_access)
+    def from_path(
+        cls, path: "str | Path", nested_access: str = ".", *, flatten: bool = True
+    ) -> typing.Self:
+        """Read the file through `SOURCE_CACHE`, so providers of the same file share the parsed content"""
+        provider = cls.__new__(cls)
+        provider._setup(nested_access, flatten)
+        from pathlib import Path
+
+        provider._path = Path(path)
+        provider.reload()
+        return provider
+
+    def sources(self) -> typing.Sequence["Path"]:
+        return (self._path,) if self._path is not None else ()
+
+    def reload(self) -> None:
+        if self._path is not None:
+            nested_access, flatten = self._nested_access, self._flatten
+            self._document = SOURCE_CACHE.get(
+                self._path,
+                (self._format, nested_access, flatten),
+                lambda f: self._parse(f.read(), nested_access, flatten),
+            )
 
     @classmethod
-    def from_file(cls, file: typing.IO[str], nested_access: str = ".") -> typing.Self:
+    def from_file(
+        cls, file: typing.IO[str], nested_access: str = ".", *, flatten: bool = True
+    ) -> typing.Self:
         contents = file.read()
         file.close()
-        return cls(contents, nested_access)
+        return cls(contents, nested_access, flatten=flatten)
 
     @classmethod
-    def from_string(cls, inp: str, nested_access: str = "."):
-        return cls(inp, nested_access)
+    def from_string(cls, inp: str, nested_access: str = ".", *, flatten: bool = True):
+        return cls(inp, nested_access, flatten=flatten)
 
     def get(self, name: str) -> str:
-        nested = name.split(self._nested_access)
-        result: typing.Optional[str] = None
-        storage = self._content
+        result = self._document.lookup(name)
+        if result is None:
+            raise VariableNotFoundError(name)
 
-        "hello.world == {'hello': {'world': 123}'"
-        for k in nested:
-            result = storage.get(k)  # type: ignore
-            storage = result  # type: ignore
+        return self.to_str(result)
 
-        if result is None or not isinstance(result, str):
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        if not self._bulk:
+            return super().get_many(names)
+
+        lookup, to_str = self._document.lookup, self.to_str
+        found: typing.Dict[str, str] = {}
+        for name in names:
+            result = lookup(name)
+            if result is not None:
+                found[name] = to_str(result)
+        return found
+
+    def get_typed(self, name: str) -> typing.Any:
+        if not self._bulk:
+            return self.get(name)
+
+        result = self._document.lookup(name)
+        if result is None:
             raise VariableNotFoundError(name)
 
         return result
 
+    def lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        if not self._bulk:
+            return super().lookup(name, missing)
+
+        result = self._document.lookup(name)
+        return missing if result is None else result
+
+    def get_many_typed(self, names: typing.Iterable[str]) -> typing.Dict[str, typing.Any]:
+        if not self._bulk:
+            return super().get_many_typed(names)
+
+        lookup = self._document.lookup
+        found: typing.Dict[str, typing.Any] = {}
+        for name in names:
+            result = lookup(name)
+            if result is not None:
+                found[name] = result
+        return found
+
+
+class JSONProvider(_DocumentProvider):
+    _format = "json"
+
+    @classmethod
+    def _decode(cls, inp: str | bytes) -> typing.Any:
+        import json
+
+        # betterconf itself deserializes values, so numbers are kept as they are written
+        return json.loads(inp, parse_int=str, parse_float=str, parse_constant=str)
+
+    def to_str(self, value: typing.Any) -> str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, list):
+            import json
+
+            return json.dumps(_legacy(value))
+        return str(value)
+
+
+class TOMLProvider(_DocumentProvider):
+    """Values of a TOML document, tables are accessed like `table.key`"""
+
+    _format = "toml"
+
+    @classmethod
+    def _decode(cls, inp: str | bytes) -> typing.Any:
+        import tomllib
+
+        return tomllib.loads(inp if isinstance(inp, str) else inp.decode())
+
+    def to_str(self, value: typing.Any) -> str:
+        if isinstance(value, str):
+            return value
+        import datetime
+        import json
+
+        if isinstance(value, list):
+            return json.dumps(value, default=str)
+        if isinstance(value, (datetime.date, datetime.time)):
+            return value.isoformat()
+        return str(value)
+
+
+def _legacy(value: typing.Any) -> typing.Any:
+    """`value` as it used to be decoded: bools and lists in objects were turned into strs right away"""
+    import json
+
+    if isinstance(value, dict):
+        return {
+            k: str(v)
+            if isinstance(v, bool)
+            else json.dumps(_legacy(v))
+            if isinstance(v, list)
+            else _legacy(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_legacy(v) for v in value]
+    return value
+
+
+def _is_leaf(value: typing.Any) -> bool:
+    # objects and nulls aren't values
+    return value is not None and not isinstance(value, dict)
+
+
+class _Document:
+    """A decoded document, shared by providers (see `SOURCE_CACHE`).
+    Only `index` is filled later, with the same values for everyone. Leaves are kept typed"""
+
+    __slots__ = ("content", "separator", "index", "indexed", "paths")
+
+    def __init__(self, content: typing.Dict[str, typing.Any], separator: str, flatten: bool):
+        self.content = content
+        self.separator = separator
+        # {"a.b.c": value} for every leaf of the indexed top-level keys, if `flatten`
+        self.index: typing.Optional[typing.Dict[str, typing.Any]] = {} if flatten else None
+        self.indexed: typing.Set[str] = set()
+        self.paths: typing.Dict[str, typing.List[str]] = {}
+
+    def lookup(self, name: str) -> typing.Any:
+        """The leaf at `name` or None"""
+        index = self.index
+        if index is not None:
+            result = index.get(name)
+            if result is not None:
+                return result
+
+            top = name.partition(self.separator)[0]
+            if top in self.indexed:
+                return None
+            self._index(top)
+            return index.get(name)
+
+        nested = self.paths.get(name)
+        if nested is None:
+            nested = self.paths[name] = name.split(self.separator)
+
+        "hello.world == {'hello': {'world': 123}'"
+        result: typing.Any = self.content
+        for k in nested:
+            if not isinstance(result, dict):
+                return None
+            result = result.get(k)
+
+        return result if _is_leaf(result) else None
+
+    def _index(self, top: str) -> None:
+        value = self.content.get(top)
+        if isinstance(value, dict):
+            self.index.update(_flatten(value, self.separator, top + self.separator))  # type: ignore
+        elif _is_leaf(value):
+            self.index[top] = value  # type: ignore
+        self.indexed.add(top)
+
+
+def _flatten(
+    content: typing.Dict[str, typing.Any], separator: str, prefix: str = ""
+) -> typing.Dict[str, typing.Any]:
+    """Flatten nested dicts into `{"a.b.c": value}` with all leaves"""
+    index: typing.Dict[str, typing.Any] = {}
+    stack: typing.List[typing.Tuple[str, typing.Dict[str, typing.Any]]] = [(prefix, content)]
+    while stack:
+        prefix, storage = stack.pop()
+        for k, v in storage.items():
+            # such keys can't be reached with nested access
+            if separator in k:
+                continue
+
+            path = prefix + k
+            if isinstance(v, dict):
+                stack.append((path + separator, v))
+            elif _is_leaf(v):
+                index[path] = v
+    return index
+
+
+_DOTENV_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_DOTENV_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+_DOTENV_COMMENT = re.compile(r"\s#")
+_QUOTES = frozenset("'\"")
+# without any of these every line is a plain `KEY=value`
+_DOTENV_SPECIAL = ("#", "'", '"', "\r", " ", "\t")
+
+
+def _unescape(match: re.Match[str]) -> str:
+    char = match.group(1)
+    return _DOTENV_ESCAPES.get(char, "\\" + char)
+
+
+def _closing_quote(body: str, quote: str, start: int = 0) -> int:
+    end = body.find(quote, start)
+    if quote == "'":
+        return end
+
+    while end >= 0:
+        escapes = end
+        while escapes and body[escapes - 1] == "\\":
+            escapes -= 1
+        if (end - escapes) % 2 == 0:
+            return end
+        end = body.find(quote, end + 1)
+    return end
+
+
+def _parse_dotenv(
+    text: str,
+    into: typing.MutableMapping[str, str],
+    lower: bool = False,
+) -> None:
+    """Parse dotenv entries in a single pass over the lines, putting them right into `into`.
+    Supports comments, `export`, quoted values (double quoted ones with escapes) and multiline quoted values"""
+    if not any(char in text for char in _DOTENV_SPECIAL):
+        # generated files usually have nothing to tokenize, so they are just split
+        entries = (line.split("=", 1) for line in text.split("\n") if line)
+        try:
+            into.update(((k.lower(), v) for k, v in entries) if lower else entries)  # type: ignore
+            return
+        except ValueError:
+            # a line without `=`, the tokenizer below tells which one
+            pass
+
+    if "\r" in text:
+        text = text.replace("\r\n", "\n")
+    lines = text.split("\n")
+    i, count = 0, len(lines)
+    while i < count:
+        line = lines[i].lstrip()
+        i += 1
+        if not line or line[0] == "#":
+            continue
+
+        key, eq, value = line.partition("=")
+        if not eq:
+            raise BetterconfError(
+                f"DotenvProvider can't read your dotenv file because it seems to be broken at line {i}"
+            )
+        key = key.rstrip()
+        if key.startswith("export") and key[6:7].isspace():
+            key = key[7:].lstrip()
+
+        stripped = value.lstrip()
+        quote = stripped[:1]
+        if quote in _QUOTES:
+            first_line = i
+            body = stripped[1:]
+            end = _closing_quote(body, quote)
+            while end < 0:
+                if i == count:
+                    raise BetterconfError(
+                        f"DotenvProvider can't find the closing quote of the value at line {first_line}"
+                    )
+                searched = len(body)
+                body = f"{body}\n{lines[i]}"
+                i += 1
+                end = _closing_quote(body, quote, searched)
+
+            rest = body[end + 1 :].strip()
+            if rest and rest[0] != "#":
+                raise BetterconfError(
+                    f"DotenvProvider can't read your dotenv file because it seems to be broken at line {i}"
+                )
+            value = body[:end]
+            if quote == '"' and "\\" in value:
+                value = _DOTENV_ESCAPE.sub(_unescape, value)
+        else:
+            if "#" in value:
+                # `A=#1` is a value, `A= #1` is a comment
+                comment = _DOTENV_COMMENT.search(value)
+                if comment is not None:
+                    value = value[: comment.start()]
+            value = value.strip()
+
+        into[key.lower() if lower else key] = value
+
 
 class DotenvProvider(AbstractProvider):
+    _bulk = True
+
     def __init__(
         self,
-        file_path: str | Path = ".env",
+        file_path: "str | Path" = ".env",
         *,
         auto_load: bool = False,
         ignore_case: bool = False,
@@ -98,68 +679,124 @@ class DotenvProvider(AbstractProvider):
 
         self._environ = EnvironmentProvider()
         self._inner: dict[str, str] = {}
+        # lowercased name -> real name of the environment variable, for `ignore_case`
+        self._env_index: typing.Optional[dict[str, str]] = None
+        self._env_index_size = 0
 
         self._auto_load = auto_load
 
     def _normalize(self, name: str) -> str:
         return name.lower() if self.ignore_case else name
 
-    def _put_lines_to_vars(self, into: typing.Literal["env", "in"]):
-        with open(self.file_path, "r") as f:
-            lines = f.readlines()
-
+    def _parse(self, f: typing.BinaryIO) -> dict[str, str]:
         vars: dict[str, str] = {}
-        for line in lines:
-            if line == "\n":
-                continue
-            try:
-                var_name, var_value = line.split("=", 1)
-            except ValueError:
-                raise BetterconfError(
-                    "DotenvProvider can't read your dotenv file because it seems to be broken"
-                )
+        _parse_dotenv(f.read().decode(), vars, lower=self.ignore_case)
+        return vars
 
-            var_value = var_value.rstrip("\n")
-            var_name = self._normalize(var_name.rstrip("\n"))
-
-            vars[var_name] = var_value
+    def _put_lines_to_vars(self, into: typing.Literal["env", "in"]):
+        # shared with other providers of the same file through `SOURCE_CACHE`, so it's never modified
+        vars: dict[str, str] = SOURCE_CACHE.get(
+            self.file_path, ("dotenv", self.ignore_case), self._parse
+        )
 
         self._loaded_into = into
+        self._env_index = None
         if into == "in":
-            self._inner.update(vars)
+            self._inner = vars
         elif into == "env":
             os.environ.update(vars if not self.ignore_case else {
                 k.upper(): v for k, v in vars.items()
             })
 
+    def sources(self) -> typing.Sequence["Path"]:
+        from pathlib import Path
+
+        return (Path(self.file_path),) if self._loaded_into else ()
+
+    def reload(self) -> None:
+        if self._loaded_into:
+            self._put_lines_to_vars(into=self._loaded_into)
+
     def load_into_env(self):
         self._put_lines_to_vars(into="env")
 
     def load_into_provider(self):
         self._put_lines_to_vars(into="in")
 
-    def get(self, name: str) -> str:
+    def _lookup_env_ignoring_case(self, key: str) -> typing.Optional[str]:
+        # the index is rebuilt when the size of the environment changes, `load_into_env` and `reload` drop it.
+        # Misses stay O(1): a variable swapped for another one behind our back (the size is the same)
+        # is only seen after `reload`, a hit on a variable that's gone rebuilds the index once
+        for _ in range(2):
+            if self._env_index is None or self._env_index_size != len(os.environ):
+                index: dict[str, str] = {}
+                for k in os.environ:
+                    # the first match wins, like in a plain scan over the environment
+                    index.setdefault(k.lower(), k)
+                self._env_index = index
+                self._env_index_size = len(os.environ)
+
+            real_name = self._env_index.get(key)
+            if real_name is None:
+                return None
+            value = os.environ.get(real_name)
+            if value is not None:
+                return value
+            self._env_index = None
+        return None
+
+    def _ensure_loaded(self) -> None:
         if self._auto_load and not self._loaded_into:
             self.load_into_provider()
 
         if not self._loaded_into:
             raise BetterconfError("You haven't loaded values from .env manually")
 
-        key = self._normalize(name)
+    def lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        if not self._bulk:
+            return super().lookup(name, missing)
+        return self._lookup(name, missing)
+
+    def _lookup(self, name: str, missing: typing.Any = None) -> typing.Any:
+        self._ensure_loaded()
 
         if self._loaded_into == "in":
-            value = self._inner.get(key)
-            if value is None:
-                raise VariableNotFoundError(name)
-            return value
-        else:
-            if self.ignore_case:
-                for k, v in os.environ.items():
-                    if k.lower() == key:
-                        return v
-                raise VariableNotFoundError(name)
+            return self._inner.get(self._normalize(name), missing)
+        if self.ignore_case:
+            value = self._lookup_env_ignoring_case(self._normalize(name))
+            return missing if value is None else value
+
+        return self._environ.lookup(name, missing)
+
+    def get(self, name: str) -> str:
+        value = self._lookup(name, _MISSING)
+        if value is _MISSING:
+            raise VariableNotFoundError(name)
+        return value
 
-            return self._environ.get(name)
+    def get_many(self, names: typing.Iterable[str]) -> typing.Dict[str, str]:
+        if not self._bulk:
+            return super().get_many(names)
+        self._ensure_loaded()
+
+        if self._loaded_into == "in":
+            inner = self._inner
+            found: typing.Dict[str, str] = {}
+            for name in names:
+                value = inner.get(self._normalize(name))
+                if value is not None:
+                    found[name] = value
+            return found
+
+        if self.ignore_case:
+            found = {}
+            for name in names:
+                value = self._lookup_env_ignoring_case(self._normalize(name))
+                if value is not None:
+                    found[name] = value
+            return found
+
+        return self._environ.get_many(names)
 
 
 DEFAULT_PROVIDER = EnvironmentProvider()
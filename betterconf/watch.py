@@ -0,0 +1,233 @@
+"""
+Watching files of providers and reloading configs when they change.
+"""
+
+import logging
+import os
+import threading
+import typing
+from dataclasses import dataclass
+from pathlib import Path
+
+from betterconf import _frozen
+from betterconf._field import _dependencies  # type: ignore
+from betterconf.exceptions import BetterconfError
+from betterconf.provider import AbstractProvider
+
+if typing.TYPE_CHECKING:
+    from betterconf._config import ConfigProto
+
+CT = typing.TypeVar("CT", bound="ConfigProto")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    # dotted path from the root config, like "Database.url"
+    path: str
+    old: typing.Any
+    new: typing.Any
+
+
+@dataclass(frozen=True)
+class ConfigDiff(typing.Generic[CT]):
+    # the config after the change: the same object, unless it's frozen
+    config: CT
+    changes: typing.Tuple[FieldChange, ...]
+
+
+class ConfigWatcher(typing.Generic[CT]):
+    """Constructs the config and keeps it up to date with the files of its providers.
+
+    Files are polled by mtime and size every `interval` seconds after `start()` (or on every `check()`).
+    When a file changes, only its provider is reloaded and only the fields it backs (with the fields referencing them)
+    are resolved again. Between reloads the config is a plain config, nothing is checked on access."""
+
+    def __init__(
+        self,
+        cfg: typing.Type[CT],
+        provider_override: typing.Optional[AbstractProvider] = None,
+        to_override: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        *,
+        interval: float = 1.0,
+    ):
+        self.interval = interval
+        self._provider_override = provider_override
+        self._to_override = to_override or {}
+        self._subscribers: typing.List[typing.Callable[[ConfigDiff[CT]], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+        self.config: CT = cfg(provider_override, **self._to_override)  # type: ignore
+        if "__bc_lazy__" in getattr(self.config, "__dict__", {}):
+            raise BetterconfError("Lazy configs can't be watched")
+
+        self._stamps: typing.Dict[Path, typing.Optional[typing.Tuple[int, int]]] = {}
+        self._providers: typing.Dict[int, AbstractProvider] = {}
+        self._collect(self.config, provider_override)
+        for provider in self._providers.values():
+            for path in provider.sources():
+                self._stamps[path] = self._stamp(path)
+
+    @staticmethod
+    def _stamp(path: Path) -> typing.Optional[typing.Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _collect(
+        self, config: "ConfigProto", provider_override: typing.Optional[AbstractProvider]
+    ) -> None:
+        inner = config.__bc_inner__
+        resolution = inner.resolution(
+            config.__bc_provider__, provider_override, self._to_override
+        )
+        for field in inner.order:
+            provider = resolution.provider_of(field)
+            if provider.sources():
+                self._providers[id(provider)] = provider
+
+        for sub_config in inner.sub_configs:
+            if sub_config.name not in self._to_override:
+                self._collect(getattr(config, sub_config.name), None)
+
+    def subscribe(
+        self, callback: typing.Callable[[ConfigDiff[CT]], None]
+    ) -> typing.Callable[[], None]:
+        """Call `callback` with every diff. Returns a function to unsubscribe"""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def check(self) -> typing.Optional[ConfigDiff[CT]]:
+        """Look for changed files once. Returns the diff if any field has changed"""
+        with self._lock:
+            changed: typing.Dict[int, AbstractProvider] = {}
+            stamps: typing.Dict[Path, typing.Optional[typing.Tuple[int, int]]] = {}
+            for provider_id, provider in self._providers.items():
+                for path in provider.sources():
+                    stamp = self._stamp(path)
+                    if stamp is not None and stamp != self._stamps.get(path):
+                        changed[provider_id] = provider
+                        stamps[path] = stamp
+
+            if not changed:
+                return None
+
+            for provider in changed.values():
+                provider.reload()
+            # only after the reload succeeded, so a broken file is read again on the next check
+            self._stamps.update(stamps)
+
+            changes: typing.List[FieldChange] = []
+            self.config = self._refresh(
+                self.config, set(changed), self._provider_override, "", changes
+            )
+            if not changes:
+                return None
+
+            diff = ConfigDiff(self.config, tuple(changes))
+
+        for callback in list(self._subscribers):
+            callback(diff)
+        return diff
+
+    def _refresh(
+        self,
+        config: "ConfigProto",
+        changed: typing.Set[int],
+        provider_override: typing.Optional[AbstractProvider],
+        path: str,
+        changes: typing.List[FieldChange],
+    ) -> typing.Any:
+        inner = config.__bc_inner__
+        names = inner.names_by_field
+        resolution = inner.resolution(
+            config.__bc_provider__, provider_override, self._to_override
+        )
+
+        # fields of changed providers and everything referencing them are resolved again, the rest is kept
+        affected: typing.Set[int] = set()
+        for field in inner.order:
+            if id(resolution.provider_of(field)) in changed or any(
+                id(dependency) in affected for dependency in _dependencies(field)
+            ):
+                affected.add(id(field))
+            elif id(field) in names:
+                resolution.values[id(field)] = getattr(config, names[id(field)][0])
+
+        updates: typing.Dict[str, typing.Any] = {}
+        for info in inner.fields:
+            if id(info.field) not in affected:
+                continue
+
+            old = getattr(config, info.name_in_python)
+            new = resolution.resolve_one(info.field)
+            if new != old:
+                updates[info.name_in_python] = new
+                changes.append(FieldChange(path + info.name_in_python, old, new))
+
+        for sub_config in inner.sub_configs:
+            if sub_config.name in self._to_override:
+                continue
+
+            old_sub = getattr(config, sub_config.name)
+            new_sub = self._refresh(
+                old_sub, changed, None, f"{path}{sub_config.name}.", changes
+            )
+            if new_sub is not old_sub:
+                updates[sub_config.name] = new_sub
+
+        if not updates:
+            return config
+
+        if not getattr(config, "__bc_frozen__", False):
+            for name, value in updates.items():
+                object.__setattr__(config, name, value)
+            return config
+
+        # frozen configs are never changed, a new one shares everything unchanged with the old
+        new_config = config.__class__.__new__(config.__class__)
+        for name in _frozen._names(config):
+            object.__setattr__(new_config, name, updates.get(name, getattr(config, name)))
+        _frozen.freeze(new_config)
+        return new_config
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Couldn't reload the config")
+
+    def start(self) -> None:
+        """Start polling in a background thread"""
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="betterconf-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> typing.Self:
+        self.start()
+        return self
+
+    def __exit__(self, *_: typing.Any) -> None:
+        self.stop()
+
+
+__all__ = ("ConfigWatcher", "ConfigDiff", "FieldChange")
@@ -16,7 +16,7 @@ from betterconf.caster import (
     ListCaster,
 )
 from betterconf.caster import to_bool, to_int
-from betterconf.exceptions import VariableNotFoundError
+from betterconf.exceptions import BetterconfError, VariableNotFoundError
 from betterconf.exceptions import ImpossibleToCastError
 
 VAR_1 = "hello"
@@ -388,3 +388,1222 @@ def test_list_caster():
     list_caster.separator = ", "
     assert list_caster.cast("a, b, c") == ["a", "b", "c"]
     assert list_caster.cast("a, b, c, ") == ["a", "b", "c"]
+
+
+def test_compiled_config(update_environ: Any):
+    @betterconf(compiled=True)
+    class CompiledConfig:
+        debug: Alias[bool, "DEBUG"]
+        name = field("COMPILED_NAME", default="John")
+        factory = field("COMPILED_FACTORY", default=lambda: [1, 2])
+        doubled = reference_field(name, func=lambda n: n * 2)
+
+        @betterconf(subconfig=True, compiled=True)
+        class Sub:
+            falsy = field("FALSY_FIELD", caster=to_int)
+
+    cfg = CompiledConfig()
+    assert cfg.debug is True
+    assert cfg.name == "John"
+    assert cfg.factory == [1, 2]
+    assert cfg.factory is not CompiledConfig().factory
+    assert cfg.doubled == "JohnJohn"
+    assert cfg.Sub.falsy == 0
+
+    class NameProvider(AbstractProvider):
+        def get(self, name: str) -> str:
+            return "off" if name == "DEBUG" else name
+
+    cfg = CompiledConfig(_provider_=NameProvider())
+    assert cfg.debug is False
+    assert cfg.name == "COMPILED_NAME"
+
+
+def test_compiled_required_and_caster_errors(monkeypatch: Any):
+    @betterconf(compiled=True)
+    class Required:
+        var1 = field("COMPILED_MISSING")
+
+    with pytest.raises(VariableNotFoundError):
+        Required()
+
+    monkeypatch.setenv("COMPILED_NOT_INT", "abc")
+
+    @betterconf(compiled=True)
+    class Ignored:
+        var1 = field("COMPILED_NOT_INT", caster=to_int, ignore_caster_error=True)
+
+    assert Ignored().var1 == "abc"
+
+
+class CountingProvider(AbstractProvider):
+    def __init__(self, values: dict[str, str]):
+        self.values = values
+        self.get_calls = 0
+        self.get_many_calls = 0
+
+    def get(self, name: str) -> str:
+        self.get_calls += 1
+        if name not in self.values:
+            raise VariableNotFoundError(name)
+        return self.values[name]
+
+    def get_many(self, names: Any) -> dict[str, str]:
+        self.get_many_calls += 1
+        return {name: self.values[name] for name in names if name in self.values}
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_get_many_per_provider(compiled: bool):
+    provider = CountingProvider({"a": "1", "b": "2"})
+
+    @betterconf(provider=provider, compiled=compiled)
+    class Config:
+        a: int
+        b: int
+        c = field("C", default="c")
+
+    cfg = Config()
+    assert (cfg.a, cfg.b, cfg.c) == (1, 2, "c")
+    assert provider.get_many_calls == 1
+    assert provider.get_calls == 0
+
+
+def test_resolution_plan():
+    provider = CountingProvider({"a": "1", "C": "3"})
+    other = CountingProvider({"a": "override"})
+
+    @betterconf(provider=provider)
+    class Config:
+        a: str
+        c = field("C", default="c")
+        d = reference_field(c, func=lambda c: c * 2)
+
+    # providers of fields are worked out once, not per construction
+    inner = Config.__bc_inner__
+    assert inner.plan(provider) is inner.plan(provider)
+    assert [p for _, p, _ in inner.plan(provider).steps] == [provider, provider, provider]
+    assert (Config().a, Config().d) == ("1", "33")
+
+    # `_provider_` and overrides are layered on top
+    cfg = Config(other, c="x")
+    assert (cfg.a, cfg.c, cfg.d) == ("override", "x", "xx")
+    assert inner.plan(provider).providers[id(Config.c)] is provider
+
+
+def test_providers_get_many(tmp_path: Any, monkeypatch: Any):
+    from betterconf.provider import (
+        EnvironmentProvider,
+        JSONProvider,
+        DotenvProvider,
+    )
+
+    monkeypatch.setenv("GET_MANY_VAR", "env")
+    assert EnvironmentProvider().get_many(["GET_MANY_VAR", "GET_MANY_NO"]) == {
+        "GET_MANY_VAR": "env"
+    }
+
+    json_provider = JSONProvider.from_string('{"a": {"b": "c"}, "d": true}')
+    assert json_provider.get_many(["a.b", "d", "a.x"]) == {"a.b": "c", "d": "True"}
+
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("GET_MANY_DOTENV=1\n")
+    provider = DotenvProvider(dotenv, auto_load=True, ignore_case=True)
+    assert provider.get_many(["get_many_dotenv", "nope"]) == {"get_many_dotenv": "1"}
+
+    provider = DotenvProvider(dotenv, ignore_case=True)
+    provider.load_into_env()
+    try:
+        assert provider.get_many(["get_many_dotenv"]) == {"get_many_dotenv": "1"}
+    finally:
+        os.environ.pop("GET_MANY_DOTENV")
+
+    class OnlyGet(AbstractProvider):
+        def get(self, name: str) -> str:
+            if name == "missing":
+                raise VariableNotFoundError(name)
+            return name
+
+    assert OnlyGet().get_many(["x", "missing"]) == {"x": "x"}
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_providers_overriding_get(tmp_path: Any, compiled: bool):
+    from betterconf.provider import EnvironmentProvider, JSONProvider, DotenvProvider
+
+    # the bundled bulk lookups don't skip a `get` of a subclass
+    class UpperEnv(EnvironmentProvider):
+        def get(self, name: str) -> str:
+            return super().get(name).upper()
+
+    class UpperJSON(JSONProvider):
+        def get(self, name: str) -> str:
+            return super().get(name).upper()
+
+    class UpperDotenv(DotenvProvider):
+        def get(self, name: str) -> str:
+            return super().get(name).upper()
+
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("OVERRIDE_GET=raw\n")
+    os.environ["OVERRIDE_GET"] = "raw"
+    try:
+        for provider in (
+            UpperEnv(),
+            UpperJSON.from_string('{"OVERRIDE_GET": "raw"}'),
+            UpperDotenv(dotenv, auto_load=True),
+        ):
+
+            @betterconf(provider=provider, compiled=compiled)
+            class Config:
+                value = field("OVERRIDE_GET")
+                missing = field("OVERRIDE_GET_MISSING", default="default")
+
+            config = Config()
+            assert (config.value, config.missing) == ("RAW", "default")
+            assert provider.lookup("OVERRIDE_GET") == "RAW"
+    finally:
+        os.environ.pop("OVERRIDE_GET")
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_async_aload(compiled: bool):
+    import asyncio
+    from betterconf.provider import AsyncMemoryProvider
+
+    class SlowProvider(AsyncMemoryProvider):
+        calls = 0
+
+        async def get_many(self, names: Any) -> dict[str, str]:
+            SlowProvider.calls += 1
+            await asyncio.sleep(0)
+            return await super().get_many(names)
+
+    @betterconf(provider=SlowProvider({"name": "async", "port": "80"}), compiled=compiled)
+    class Config:
+        name: str
+        port: int
+        missing = field("missing", default="default")
+
+        @betterconf(subconfig=True)
+        class Sub:
+            port: int
+
+        @betterconf(subconfig=True, provider=SlowProvider({"other": "sub"}))
+        class Other:
+            other: str = field("other")
+
+    with pytest.raises(BetterconfError):
+        Config()
+
+    cfg = asyncio.run(Config.aload())  # type: ignore
+    assert cfg.name == "async"
+    assert cfg.port == 80
+    assert cfg.missing == "default"
+    assert cfg.Sub.port == 80
+    assert cfg.Other.other == "sub"
+    assert SlowProvider.calls == 2
+
+
+def test_async_provider_default_get_many():
+    import asyncio
+    from betterconf.provider import AsyncAbstractProvider
+
+    class EchoProvider(AsyncAbstractProvider):
+        async def get(self, name: str) -> str:
+            if name == "missing":
+                raise VariableNotFoundError(name)
+            return name
+
+    found = asyncio.run(EchoProvider().get_many(["a", "missing", "b"]))
+    assert found == {"a": "a", "b": "b"}
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_reference_resolved_once(compiled: bool):
+    provider = CountingProvider({"base": "2"})
+
+    @betterconf(provider=provider, compiled=compiled)
+    class Config:
+        base: int = field("base", caster=to_int)
+        left = reference_field(base, func=lambda b: b + 1)
+        right = reference_field(base, func=lambda b: b * 10)
+        top = reference_field(left, right, base, func=lambda left, right, b: left + right + b)
+        deepest = reference_field(top, left, func=lambda t, left: t * left)
+
+    cfg = Config()
+    assert (cfg.base, cfg.left, cfg.right, cfg.top) == (2, 3, 20, 25)
+    assert cfg.deepest == 75
+    assert provider.get_calls == 0
+    assert provider.get_many_calls == 1
+
+
+def test_reference_cycle():
+    first = field("first")
+    second = field("second", default=first)
+    first.default = second
+
+    with pytest.raises(BetterconfError, match="cycle"):
+
+        @betterconf
+        class Config:
+            a = first
+            b = second
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_overrides_dont_leak(compiled: bool):
+    class NameProvider(AbstractProvider):
+        def get(self, name: str) -> str:
+            return f"named_{name}"
+
+    @betterconf(compiled=compiled)
+    class Config:
+        var1: int = field("LEAK_VAR_1", default=4)
+        var2: int = reference_field(var1, func=lambda v: v * 2)
+        var3 = field("LEAK_VAR_3", default="default")
+
+    assert Config(var1=15).var2 == 30
+    assert Config(_provider_=NameProvider()).var3 == "named_LEAK_VAR_3"
+
+    cfg = Config()
+    assert (cfg.var1, cfg.var2, cfg.var3) == (4, 8, "default")
+    assert Config.var1.default == 4  # type: ignore
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_concurrent_construction(compiled: bool):
+    from concurrent.futures import ThreadPoolExecutor
+
+    @betterconf(compiled=compiled)
+    class Config:
+        var1: int = field("CONCURRENT_VAR_1", default=0)
+        var2: int = reference_field(var1, func=lambda v: v + 1)
+
+    def build(i: int) -> tuple[int, int]:
+        cfg = Config(var1=i)
+        return cfg.var1, cfg.var2
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(build, range(500)))
+
+    assert results == [(i, i + 1) for i in range(500)]
+
+
+def test_snapshot_provider():
+    from betterconf.provider import SnapshotProvider, EnvironmentProvider
+
+    os.environ["SNAPSHOT_VAR"] = "before"
+    snapshot = SnapshotProvider()
+    os.environ["SNAPSHOT_VAR"] = "after"
+    assert snapshot.get("SNAPSHOT_VAR") == "before"
+
+    snapshot.refresh()
+    assert snapshot.get("SNAPSHOT_VAR") == "after"
+    with pytest.raises(TypeError):
+        snapshot.values["SNAPSHOT_VAR"] = "mutated"  # type: ignore
+
+    source = CountingProvider({"a": "1", "b": "2"})
+    snapshot = SnapshotProvider(source, names=["a", "c"])
+    assert snapshot.get_many(["a", "b", "c"]) == {"a": "1"}
+    assert source.get_many_calls == 1
+    with pytest.raises(BetterconfError):
+        SnapshotProvider(source)
+
+    env = EnvironmentProvider()
+    frozen = env.freeze()
+    os.environ["SNAPSHOT_VAR"] = "frozen"
+    assert env.get("SNAPSHOT_VAR") == "after"
+    frozen.refresh()
+    assert env.get_many(["SNAPSHOT_VAR"]) == {"SNAPSHOT_VAR": "frozen"}
+    env.unfreeze()
+    os.environ.pop("SNAPSHOT_VAR")
+    with pytest.raises(VariableNotFoundError):
+        env.get("SNAPSHOT_VAR")
+
+
+def test_dotenv_ignore_case_index(tmp_path: Any):
+    from betterconf.provider import DotenvProvider
+
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("Index_Var=1\n")
+    provider = DotenvProvider(dotenv, ignore_case=True)
+    provider.load_into_env()
+
+    def scan(key: str) -> Any:
+        for k, v in os.environ.items():
+            if k.lower() == key:
+                return v
+        return None
+
+    assert provider.get("index_var") == scan("index_var") == "1"
+
+    os.environ["INDEX_VAR_ADDED"] = "2"
+    assert provider.get("Index_Var_Added") == scan("index_var_added") == "2"
+
+    os.environ["INDEX_VAR_ADDED"] = "3"
+    assert provider.get_many(["index_var_added"]) == {"index_var_added": "3"}
+
+    os.environ.pop("INDEX_VAR_ADDED")
+    with pytest.raises(VariableNotFoundError):
+        provider.get("index_var_added")
+
+    # one variable swapped for another keeps the size: the gone one is never found,
+    # the new one is found once the index is rebuilt
+    os.environ.pop("INDEX_VAR")
+    os.environ["INDEX_VAR_NEW"] = "4"
+    try:
+        with pytest.raises(VariableNotFoundError):
+            provider.get("index_var")
+        assert provider.get("index_var_new") == scan("index_var_new") == "4"
+
+        os.environ["INDEX_VAR"] = "1"
+        assert provider.get("index_var") == "1"
+        os.environ.pop("INDEX_VAR_NEW")
+        os.environ["INDEX_VAR_NEWER"] = "5"
+        # misses don't walk the environment: the new variable is seen after `reload`
+        with pytest.raises(VariableNotFoundError):
+            provider.get("index_var_newer")
+        provider.reload()
+        assert provider.get("index_var_newer") == scan("index_var_newer") == "5"
+    finally:
+        for name in ("INDEX_VAR", "INDEX_VAR_NEW", "INDEX_VAR_NEWER"):
+            os.environ.pop(name, None)
+
+
+def test_constant_caster_lookup():
+    from betterconf.caster import to_logging_log_level, to_loguru_log_level
+
+    def legacy_cast(caster: ConstantCaster[Any], val: str) -> Any:
+        # ConstantCaster.cast before the lookup table
+        if val in caster.ABLE_TO_CAST:
+            return caster.ABLE_TO_CAST.get(val.lower())
+        for key in caster.ABLE_TO_CAST:
+            if isinstance(key, tuple) and val.lower() in key:
+                return caster.ABLE_TO_CAST[key]
+            elif isinstance(key, str) and val.lower() == key:
+                return caster.ABLE_TO_CAST[key]
+        raise ImpossibleToCastError(val, caster)
+
+    # the speed is measured by `caster/constant-lookup` against `caster/constant-lookup-legacy` in benchmarks/bench.py
+    cases = [
+        (to_bool, ["true", "TRUE", "Off", "no", "On", "0"]),
+        (to_logging_log_level, ["DEBUG", "WARNING", "CRITICAL", "NOTSET"]),
+        (to_loguru_log_level, ["info", "SUCCESS", "Trace", "critical"]),
+    ]
+    for caster, values in cases:
+        for val in values:
+            new = caster.cast(val)
+            if caster is not to_logging_log_level:  # the legacy cast was broken for it
+                assert new == legacy_cast(caster, val)
+
+    assert to_logging_log_level.cast("DEBUG") == to_logging_log_level.cast("debug") == 10
+
+
+@pytest.mark.parametrize("flatten", [True, False])
+def test_json_provider_index(flatten: bool):
+    from betterconf.provider import JSONProvider
+    import json
+
+    data = json.dumps(
+        {
+            "a": {"b": {"c": "deep", "n": 1.5}, "flag": False},
+            "s": "str",
+            "dotted.key": "unreachable",
+            "items": [1, 2],
+        }
+    )
+    provider = JSONProvider.from_string(data, flatten=flatten)
+    assert provider.get("a.b.c") == "deep"
+    assert provider.get("a.b.n") == "1.5"
+    assert provider.get("a.flag") == "False"
+    assert provider.get("items") == '["1", "2"]'
+    assert provider.get_many(["s", "a.b", "s.x", "dotted.key", "a.b.c"]) == {
+        "s": "str",
+        "a.b.c": "deep",
+    }
+    with pytest.raises(VariableNotFoundError):
+        provider.get("s.x")
+
+
+def test_json_provider_lazy_values():
+    from betterconf.provider import JSONProvider
+    import json
+
+    data = json.dumps(
+        {
+            "big": {f"key_{i}": {"value": [i, True]} for i in range(1000)},
+            "small": {"list": [True, {"flag": True, "items": [1]}], "none": None},
+        }
+    )
+    provider = JSONProvider.from_string(data)
+    assert provider.get("small.list") == '[true, {"flag": "True", "items": "[\\"1\\"]"}]'
+    with pytest.raises(VariableNotFoundError):
+        provider.get("small.none")
+    # "big" was never requested, so it's left as decoded
+    assert provider._document.indexed == {"small"}
+
+
+def test_lazy_config():
+    provider = CountingProvider({"host": "localhost", "port": "80", "user": "admin"})
+    built: list[str] = []
+
+    @betterconf(provider=provider, lazy=True)
+    class Config:
+        host = field("host")
+        port: int = field("port", caster=to_int)
+        url = reference_field(host, port, func=lambda h, p: f"{h}:{p}")
+        missing = field("missing", default="default")
+
+        @betterconf(subconfig=True, lazy=True)
+        class Credentials:
+            user: str
+
+    original_init = Config.Credentials.__init__
+
+    def tracking_init(self: Any, *args: Any, **kwargs: Any) -> None:
+        built.append("Credentials")
+        original_init(self, *args, **kwargs)
+
+    Config.Credentials.__init__ = tracking_init  # type: ignore
+
+    cfg = Config()
+    assert provider.get_many_calls == 0
+    assert cfg.port == 80
+    assert provider.get_many_calls == 1
+    assert cfg.port == 80
+    assert cfg.url == "localhost:80"
+    assert provider.get_many_calls == 3  # host and url itself, port is already there
+    assert cfg.host == "localhost"
+    assert provider.get_many_calls == 3
+    assert cfg.missing == "default"
+    assert provider.get_many_calls == 4
+
+    assert built == []
+    assert cfg.Credentials.user == "admin"
+    assert built == ["Credentials"]
+    assert cfg.Credentials is cfg.Credentials
+
+    assert Config(host="other").host == "localhost"
+    assert Config(missing="overridden").missing == "overridden"
+    assert isinstance(Config.port, _Field)
+    with pytest.raises(AttributeError):
+        cfg.nothing  # type: ignore
+
+    with pytest.raises(BetterconfError):
+
+        @betterconf(lazy=True, compiled=True)
+        class Both:
+            pass
+
+
+def test_lazy_aload():
+    import asyncio
+    from betterconf.provider import AsyncMemoryProvider
+
+    @betterconf(provider=AsyncMemoryProvider({"name": "async"}), lazy=True)
+    class Config:
+        name: str
+
+        @betterconf(subconfig=True, lazy=True)
+        class Sub:
+            name: str = field("name")
+
+    cfg = asyncio.run(Config.aload())  # type: ignore
+    assert cfg.name == "async"
+    assert cfg.Sub.name == "async"
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_slots_config(compiled: bool):
+    @betterconf(provider=CountingProvider({"name": "slotted"}), slots=True, compiled=compiled)
+    class Config:
+        name = field("name")
+        port: int = field("port", default=80)
+        url = reference_field(name, port, func=lambda n, p: f"{n}:{p}")
+
+        @betterconf(subconfig=True, slots=True)
+        class Sub:
+            name: str
+
+    cfg = Config()
+    assert (cfg.name, cfg.port, cfg.url) == ("slotted", 80, "slotted:80")
+    assert cfg.Sub.name == "slotted"
+    assert not hasattr(cfg, "__dict__")
+    assert not hasattr(cfg.Sub, "__dict__")
+    assert Config(port=1).port == 1
+
+    with pytest.raises(AttributeError):
+        cfg.other = 1  # type: ignore
+
+
+def test_slots_subclass():
+    provider = CountingProvider({"host": "base", "PROD_host": "prod"})
+
+    @betterconf(provider=provider, slots=True)
+    class Base:
+        host: str
+        port: int = 80
+        timeout: float = field("timeout", default=1.5)
+
+    # the same provider and prefix: fields are reused
+    @betterconf(provider=provider, slots=True)
+    class Same(Base):
+        extra: str = "x"
+
+    # another prefix: parsed again from the values of the slotted base's body
+    @betterconf(provider=provider, prefix="PROD")
+    class Prod(Base):
+        pass
+
+    same, prod = Same(), Prod()
+    assert (same.host, same.port, same.timeout, same.extra) == ("base", 80, 1.5, "x")
+    assert (prod.host, prod.port, prod.timeout) == ("prod", 80, 1.5)
+
+
+def test_slots_memory():
+    import tracemalloc
+
+    def measure(slots: bool) -> int:
+        @betterconf(slots=slots)
+        class Config:
+            var1 = field("MEMORY_VAR_1", default="1")
+            var2 = field("MEMORY_VAR_2", default="2")
+            var3 = field("MEMORY_VAR_3", default="3")
+            var4 = field("MEMORY_VAR_4", default="4")
+
+            @betterconf(subconfig=True, slots=slots)
+            class Sub:
+                var5 = field("MEMORY_VAR_5", default="5")
+
+        tracemalloc.start()
+        configs = [Config() for _ in range(1000)]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(configs) == 1000
+        return size // len(configs)
+
+    regular, slotted = measure(False), measure(True)
+    assert slotted < regular
+
+
+@pytest.mark.parametrize("slots", [False, True])
+def test_frozen_config(slots: bool):
+    from betterconf import reload
+    from betterconf.exceptions import FrozenConfigError
+
+    @betterconf(frozen=True, slots=slots)
+    class Config:
+        host = field("FROZEN_HOST", default="localhost")
+        tags = field("FROZEN_TAGS", default="a,b")
+
+        @betterconf(subconfig=True, frozen=True, slots=slots)
+        class Database:
+            url = field("FROZEN_DB_URL", default="sqlite://")
+
+        @betterconf(subconfig=True, frozen=True, slots=slots)
+        class Cache:
+            url = field("FROZEN_CACHE_URL", default="memory://")
+
+    cfg = Config()
+    with pytest.raises(FrozenConfigError):
+        cfg.host = "other"  # type: ignore
+    with pytest.raises(AttributeError):
+        del cfg.host
+
+    assert cfg == Config()
+    assert hash(cfg) == hash(Config())
+    assert cfg != Config(host="other")
+    assert {cfg: 1}[Config()] == 1
+
+    assert reload(cfg) is cfg
+
+    os.environ["FROZEN_CACHE_URL"] = "redis://"
+    try:
+        reloaded = reload(cfg)
+    finally:
+        os.environ.pop("FROZEN_CACHE_URL")
+
+    assert reloaded is not cfg
+    assert reloaded.Database is cfg.Database
+    assert reloaded.Cache is not cfg.Cache
+    assert reloaded.Cache.url == "redis://"
+    assert hash(reloaded) == hash(Config(Cache=reloaded.Cache))
+
+
+def test_frozen_subconfigs_are_frozen():
+    with pytest.raises(BetterconfError):
+
+        @betterconf(frozen=True)
+        class Config:
+            name: str = "x"
+
+            @betterconf(subconfig=True)
+            class Sub:
+                value: str = "y"
+
+
+def test_frozen_unhashable():
+    @betterconf(frozen=True)
+    class Config:
+        items = field("FROZEN_ITEMS", default=lambda: [1, 2])
+
+    cfg = Config()
+    assert cfg == Config()
+    with pytest.raises(TypeError):
+        hash(cfg)
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+def test_config_watcher(tmp_path: Any, frozen: bool):
+    import json
+    from betterconf import ConfigWatcher
+    from betterconf.provider import DotenvProvider, JSONProvider
+
+    json_path = tmp_path / "config.json"
+    json_path.write_text(json.dumps({"host": "localhost", "port": "80"}))
+    dotenv_path = tmp_path / ".env"
+    dotenv_path.write_text("TOKEN=first\n")
+
+    json_provider = JSONProvider.from_path(json_path)
+    dotenv_provider = DotenvProvider(str(dotenv_path), auto_load=True)
+    counting = CountingProvider({"TOKEN": "x"})
+
+    @betterconf(provider=json_provider, frozen=frozen)
+    class Config:
+        host = field("host")
+        port = field("port", caster=to_int)
+        url = reference_field(host, port, func=lambda h, p: f"{h}:{p}")
+        other = field("TOKEN", provider=counting)
+
+        @betterconf(subconfig=True, provider=dotenv_provider, frozen=frozen)
+        class Secrets:
+            token = field("TOKEN")
+
+    watcher = ConfigWatcher(Config)
+    diffs: Any = []
+    watcher.subscribe(diffs.append)
+    original = watcher.config
+    assert original.url == "localhost:80"
+    assert watcher.check() is None
+
+    calls = counting.get_calls + counting.get_many_calls
+    json_path.write_text(json.dumps({"host": "localhost", "port": "8080"}))
+    diff = watcher.check()
+    assert diff is not None and diffs == [diff]
+    assert [(c.path, c.old, c.new) for c in diff.changes] == [
+        ("port", 80, 8080),
+        ("url", "localhost:80", "localhost:8080"),
+    ]
+    # fields of unchanged providers aren't fetched again
+    assert counting.get_calls + counting.get_many_calls == calls
+    assert watcher.config.port == 8080
+    assert (watcher.config is original) is not frozen
+    assert watcher.config.Secrets is original.Secrets
+
+    dotenv_path.write_text("TOKEN=second-token\n")
+    diff = watcher.check()
+    assert diff is not None
+    assert [(c.path, c.new) for c in diff.changes] == [("Secrets.token", "second-token")]
+    assert watcher.config.Secrets.token == "second-token"
+
+    with watcher:
+        pass
+
+
+def test_source_cache(tmp_path: Any):
+    from betterconf._cache import SourceCache
+    from betterconf.provider import SOURCE_CACHE, DotenvProvider, JSONProvider
+
+    path = tmp_path / "config.json"
+    path.write_text('{"a": {"b": "1"}}')
+    SOURCE_CACHE.clear()
+
+    first = JSONProvider.from_path(path)
+    second = JSONProvider.from_path(str(path))
+    assert first._document is second._document
+    assert SOURCE_CACHE.stats()[:2] == (1, 1)
+    # other options mean another parsed structure
+    assert JSONProvider.from_path(path, flatten=False)._document is not first._document
+
+    path.write_text('{"a": {"b": "22"}}')
+    assert JSONProvider.from_path(path).get("a.b") == "22"
+    assert first.get("a.b") == "1"
+
+    dotenv = tmp_path / ".env"
+    dotenv.write_text("A=1\n\nB=2\n")
+    one, two = DotenvProvider(dotenv, auto_load=True), DotenvProvider(dotenv, auto_load=True)
+    assert (one.get("A"), two.get("B")) == ("1", "2")
+    assert one._inner is two._inner
+
+    cache = SourceCache(maxsize=2)
+    files = [tmp_path / f"{i}.txt" for i in range(3)]
+    for i, file in enumerate(files):
+        file.write_text(str(i))
+        cache.get(file, "txt", lambda f: int(f.read()))
+    assert cache.stats() == (0, 3, 2, 2)
+    assert cache.get(files[2], "txt", lambda f: int(f.read())) == 2
+    assert cache.get(files[0], "txt", lambda f: int(f.read())) == 0
+    assert cache.stats() == (1, 4, 2, 2)
+
+
+def test_dotenv_tokenizer(tmp_path: Any):
+    from betterconf.provider import DotenvProvider
+
+    dotenv = tmp_path / ".env"
+    dotenv.write_text(
+        "# a comment\n"
+        "\n"
+        "export EXPORTED=1\n"
+        "  SPACED = some value   # and a comment\n"
+        "HASH=a#b\n"
+        "EMPTY= # nothing\n"
+        "SINGLE='raw \\n # value'\n"
+        'DOUBLE="line\\n\\"quoted\\"" # comment\n'
+        'MULTI="first\n'
+        "second\n"
+        '"\n'
+        "WINDOWS=crlf\r\n"
+        "LAST=no newline"
+    )
+    provider = DotenvProvider(dotenv, auto_load=True)
+    assert provider.get_many(
+        ["EXPORTED", "SPACED", "HASH", "EMPTY", "SINGLE", "DOUBLE", "MULTI", "WINDOWS", "LAST"]
+    ) == {
+        "EXPORTED": "1",
+        "SPACED": "some value",
+        "HASH": "a#b",
+        "EMPTY": "",
+        "SINGLE": "raw \\n # value",
+        "DOUBLE": 'line\n"quoted"',
+        "MULTI": "first\nsecond\n",
+        "WINDOWS": "crlf",
+        "LAST": "no newline",
+    }
+
+    for broken, line in [("A=1\nB\n", 2), ("A=1\n\nB='1\n", 3), ("A='1' 2\n", 1)]:
+        dotenv.write_text(broken)
+        with pytest.raises(BetterconfError, match=f"line {line}"):
+            DotenvProvider(dotenv).load_into_provider()
+
+    # generated files without anything to tokenize
+    dotenv.write_text("".join(f"KEY_{i}=value_{i}\n" for i in range(20000)))
+    provider = DotenvProvider(dotenv, auto_load=True, ignore_case=True)
+    assert provider.get("key_19999") == "value_19999"
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_typed_provider_values(compiled: bool):
+    from betterconf.provider import JSONProvider
+    import json
+
+    class StrOnlyCaster(AbstractCaster):
+        def cast(self, val: str) -> Any:
+            assert isinstance(val, str)
+            return f"<{val}>"
+
+    class DuckCaster:
+        # only `cast`, not an `AbstractCaster`
+        def cast(self, val: str) -> Any:
+            return val.upper()
+
+    provider = JSONProvider.from_string(
+        json.dumps({"debug": True, "hosts": ["a", "b"], "port": 80, "name": "app"})
+    )
+
+    @betterconf(provider=provider, compiled=compiled)
+    class Config:
+        debug = field("debug", caster=to_bool)
+        hosts = field("hosts", caster=ListCaster())
+        port = field("port", caster=to_int)
+        raw_debug = field("debug")
+        wrapped = field("hosts", caster=StrOnlyCaster())
+        shouted = field("debug", caster=DuckCaster())  # type: ignore
+
+    cfg = Config()
+    assert cfg.debug is True
+    assert cfg.hosts == ["a", "b"]
+    # shared values are copied
+    assert cfg.hosts is not Config().hosts
+    assert cfg.port == 80
+    # without a typed path casters get values as `get` returns them
+    assert cfg.raw_debug == provider.get("debug") == "True"
+    assert cfg.wrapped == '<["a", "b"]>'
+    assert cfg.shouted == "TRUE"
+
+    assert Config(_provider_=provider).debug is True
+
+
+@pytest.mark.parametrize("flatten", [True, False])
+def test_toml_provider(tmp_path: Any, flatten: bool):
+    from betterconf import TOMLProvider, JSONProvider
+    from betterconf.caster import to_float
+
+    path = tmp_path / "config.toml"
+    path.write_text(
+        'name = "app"\n'
+        "debug = true\n"
+        "released = 2024-01-02\n"
+        "\n"
+        "[server]\n"
+        "port = 8080\n"
+        "ratio = 0.5\n"
+        'hosts = ["a", "b"]\n'
+        "\n"
+        "[server.tls]\n"
+        'cert = "cert.pem"\n'
+    )
+    provider = TOMLProvider.from_path(path, flatten=flatten)
+    assert TOMLProvider.from_path(path, flatten=flatten)._document is provider._document
+
+    assert provider.get("server.tls.cert") == "cert.pem"
+    assert provider.get("server.port") == "8080"
+    assert provider.get("debug") == "True"
+    assert provider.get("released") == "2024-01-02"
+    assert provider.get("server.hosts") == '["a", "b"]'
+    assert provider.get_many(["name", "server", "server.tls.key", "server.ratio"]) == {
+        "name": "app",
+        "server.ratio": "0.5",
+    }
+    with pytest.raises(VariableNotFoundError):
+        provider.get("server.tls")
+
+    @betterconf(provider=provider)
+    class Config:
+        debug = field("debug", caster=to_bool)
+        port = field("server.port", caster=to_int)
+        ratio = field("server.ratio", caster=to_float)
+        hosts = field("server.hosts", caster=ListCaster())
+
+    cfg = Config()
+    assert (cfg.debug, cfg.port, cfg.ratio, cfg.hosts) == (True, 8080, 0.5, ["a", "b"])
+
+    # the same document as JSON is served the same way
+    as_json = JSONProvider.from_string(
+        '{"name": "app", "server": {"tls": {"cert": "cert.pem"}}}', flatten=flatten
+    )
+    names = ["name", "server.tls.cert", "server.tls", "nothing"]
+    assert as_json.get_many(names) == provider.get_many(names)
+
+
+def test_layered_provider(tmp_path: Any):
+    from betterconf import LayeredProvider, JSONProvider
+
+    path = tmp_path / "defaults.json"
+    path.write_text('{"host": "localhost", "port": 80, "debug": false, "tags": ["a"]}')
+    defaults = JSONProvider.from_path(path)
+    env = CountingProvider({"port": "8080"})
+    provider = LayeredProvider({"host": "cli-host"}, env, defaults)
+
+    @betterconf(provider=provider)
+    class Config:
+        host = field("host")
+        port = field("port", caster=to_int)
+        debug = field("debug", caster=to_bool)
+        tags = field("tags")
+        missing = field("missing", default="none")
+
+    cfg = Config()
+    assert (cfg.host, cfg.port, cfg.debug, cfg.tags, cfg.missing) == (
+        "cli-host",
+        8080,
+        False,
+        '["a"]',
+        "none",
+    )
+    assert provider.source_of("host") is provider.layers[0]
+    assert provider.source_of("port") is env
+    assert provider.source_of("debug") is defaults
+    assert provider.source_of("missing") is None
+    assert provider.get_many(["debug", "missing"]) == {"debug": "False"}
+    with pytest.raises(VariableNotFoundError):
+        provider.get("missing")
+
+    # layers are asked once per name and never through `get`
+    Config()
+    assert (env.get_calls, env.get_many_calls) == (0, 1)
+
+    assert provider.sources() == (path,)
+    path.write_text('{"port": 1, "debug": true, "tags": []}')
+    env.values = {}
+    provider.reload()
+    assert Config().port == 1
+    assert provider.source_of("debug") is defaults
+    assert provider.source_of("host") is provider.layers[0]
+
+
+def test_missing_values():
+    values = {f"FIELD_{i}": str(i) for i in range(0, 100, 10)}
+
+    class RaisingProvider(AbstractProvider):
+        def get(self, name: str) -> str:
+            if name not in values:
+                raise VariableNotFoundError(name)
+            return values[name]
+
+    class LookupProvider(RaisingProvider):
+        def lookup(self, name: str, missing: Any = None) -> Any:
+            return values.get(name, missing)
+
+    def make(provider: AbstractProvider) -> Any:
+        namespace = {f"field_{i}": field(f"FIELD_{i}", default="default") for i in range(100)}
+        return betterconf(provider=provider)(type("Config", (), namespace))
+
+    raising, lookup = make(RaisingProvider()), make(LookupProvider())
+    assert raising().field_10 == lookup().field_10 == "10"
+    assert raising().field_11 == lookup().field_11 == "default"
+    # the speed is measured by `construct/missing-*` in benchmarks/bench.py
+
+
+def test_schema_reuse_in_subclasses():
+    from betterconf._config import _TYPE_HINTS
+
+    @betterconf
+    class Base:
+        debug: bool = False
+        host: str
+        port = field("BASE_PORT", default=80)
+
+        @betterconf(subconfig=True)
+        class SMTP:
+            server: str = "smtp.gmail.com"
+            login: str
+
+    @betterconf
+    class Same(Base):
+        extra: str = "x"
+
+    @betterconf(prefix="PROD")
+    class Prod(Base):
+        @betterconf(subconfig=True)
+        class SMTP(Base.SMTP):
+            login: str = "prod@gmail.com"
+
+    # the subclass with the same prefix and provider takes the base's fields as they are
+    base_fields = Base.__bc_inner__.fields_by_info
+    same_fields = Same.__bc_inner__.fields_by_info
+    assert same_fields["host"] is base_fields["host"]
+    assert same_fields["debug"] is base_fields["debug"]
+    assert "extra" in same_fields
+    # annotations of the base are evaluated once for all subclasses
+    assert _TYPE_HINTS[Same]["host"] is _TYPE_HINTS[Base]["host"] is str
+
+    # inherited fields keep their defaults in subclasses with another prefix
+    os.environ["PROD_host"] = "prod-host"
+    try:
+        prod = Prod()
+    finally:
+        os.environ.pop("PROD_host")
+    assert prod.debug is False
+    assert prod.SMTP.server == "smtp.gmail.com"
+    assert prod.SMTP.login == "prod@gmail.com"
+
+    # inherited fields are read from the subclass's provider unless they have their own one
+    p1 = CountingProvider({"host": "p1-host", "PORT": "1", "OWN": "own"})
+    p2 = CountingProvider({"host": "p2-host", "PORT": "2", "OWN": "not own"})
+
+    @betterconf(provider=p1)
+    class First:
+        host: str
+        port: str = field("PORT")
+        own: str = field("OWN", provider=p1)
+
+    @betterconf(provider=p2)
+    class Second(First):
+        pass
+
+    first, second = First(), Second()
+    assert (first.host, first.port, first.own) == ("p1-host", "1", "own")
+    assert (second.host, second.port, second.own) == ("p2-host", "2", "own")
+    assert First.__bc_inner__.fields_by_name["port"].provider is p1
+
+
+def test_schema_cache(tmp_path: Any, monkeypatch: Any):
+    import importlib
+    import sys
+    from betterconf import _config, _schema, enable_schema_cache, disable_schema_cache
+
+    module = tmp_path / "cached_settings.py"
+    source = (
+        "from __future__ import annotations\n"
+        "import os\n"
+        "from betterconf import betterconf, field\n\n"
+        "@betterconf\n"
+        "class Mode:\n"
+        "    host: str = field('CACHED_MODE_HOST', default='x') if os.environ.get('CACHED_MODE') else 'localhost'\n\n"
+        "@betterconf(prefix='CACHED')\n"
+        "class Config:\n"
+        "    host: str\n"
+        "    port: int = field(default=80)\n"
+        "    debug: bool = False\n"
+        "    name = field('NAME', default='app')\n"
+    )
+    module.write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.setenv("CACHED_host", "localhost")
+
+    def load_module() -> Any:
+        sys.modules.pop("cached_settings", None)
+        importlib.invalidate_caches()
+        return importlib.import_module("cached_settings").Config()
+
+    enable_schema_cache(tmp_path / "cache")
+    try:
+        config = load_module()
+        _schema._flush()
+        assert (config.host, config.port, config.debug) == ("localhost", 80, False)
+        assert len(list((tmp_path / "cache").glob("cached_settings.*.json"))) == 1
+
+        # a new process: annotations aren't evaluated anymore
+        _schema._files.clear()
+        with monkeypatch.context() as m:
+            m.setattr(_config, "_type_hints", lambda cfg: pytest.fail("evaluated"))
+            config = load_module()
+        assert (config.host, config.port, config.debug, config.name) == ("localhost", 80, False, "app")
+
+        # the same source, but the class body depends on the environment: the stored spec doesn't fit anymore
+        for path in (tmp_path / "cache").iterdir():
+            path.unlink()
+        _schema._files.clear()
+        monkeypatch.setenv("CACHED_MODE", "1")
+        load_module()
+        _schema._flush()
+        _schema._files.clear()
+        monkeypatch.delenv("CACHED_MODE")
+        load_module()
+        assert sys.modules["cached_settings"].Mode().host == "localhost"
+
+        # the source has changed, so the schema is stale
+        module.write_text(source.replace("port: int = field(default=80)", "port: float = 80.5"))
+        assert load_module().port == 80.5
+    finally:
+        disable_schema_cache()
+        sys.modules.pop("cached_settings", None)
+
+
+def test_import_budget():
+    import subprocess
+    import sys
+    import betterconf
+
+    # a fresh interpreter: what `import betterconf` pulls in, as `-X importtime` reports it
+    root = os.path.dirname(os.path.dirname(os.path.abspath(betterconf.__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import betterconf; betterconf.EnvironmentProvider"],
+        capture_output=True,
+        text=True,
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": root},
+        check=True,
+    )
+    imported = {
+        line.split("|")[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+    assert "betterconf" in imported
+    for heavy in ("json", "tomllib", "asyncio", "logging", "pathlib", "hashlib", "betterconf.watch", "betterconf._async"):
+        assert heavy not in imported, heavy
+
+    # imported on first access
+    from betterconf import ConfigWatcher
+    from betterconf.watch import ConfigWatcher as Watcher
+
+    assert ConfigWatcher is Watcher
+    with pytest.raises(AttributeError):
+        betterconf.NoSuchName  # type: ignore
+
+
+def test_benchmarks(tmp_path: Any):
+    import json
+    import subprocess
+    import sys
+
+    bench = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "bench.py")
+    output = tmp_path / "bench.json"
+    command = [sys.executable, bench, "--quick", "--filter", "caster/", "--json", str(output)]
+    subprocess.run(command, capture_output=True, check=True)
+
+    results = json.loads(output.read_text())["results"]
+    assert set(results) == {
+        "caster/int",
+        "caster/float",
+        "caster/bool",
+        "caster/list",
+        "caster/logging-level",
+        "caster/constant-lookup",
+        "caster/constant-lookup-legacy",
+    }
+    assert all(result["ns_per_op"] > 0 for result in results.values())
+
+    # against itself nothing has regressed, against a much faster baseline everything has
+    command += ["--baseline", str(output), "--threshold", "1000"]
+    assert subprocess.run(command, capture_output=True).returncode == 0
+    faster = {name: {"ns_per_op": result["ns_per_op"] / 10_000} for name, result in results.items()}
+    output.write_text(json.dumps({"results": faster}))
+    command[command.index("--json") + 1] = str(tmp_path / "current.json")
+    assert subprocess.run(command, capture_output=True).returncode == 1
+
+
+@pytest.mark.parametrize("compiled", [False, True])
+def test_observer(compiled: bool):
+    import io
+    from betterconf import Observer, SlowestFields, observing
+
+    provider = CountingProvider({"host": "localhost", "port": "8080"})
+    other = CountingProvider({"TOKEN": "secret"})
+
+    @betterconf(provider=provider, compiled=compiled)
+    class Config:
+        host = field("host")
+        port = field("port", caster=to_int)
+        debug: bool = False
+        token = field("TOKEN", provider=other)
+        url = reference_field(host, port, func=lambda h, p: f"http://{h}:{p}")
+
+        @betterconf(subconfig=True)
+        class Cache:
+            ttl: int = 60
+
+    class Recorder(Observer):
+        def __init__(self) -> None:
+            self.reports: list[Any] = []
+
+        def on_construction(self, report: Any) -> None:
+            self.reports.append(report)
+
+    recorder = Recorder()
+    with observing(recorder):
+        config = Config()
+    assert (config.host, config.port, config.url, config.Cache.ttl) == ("localhost", 8080, "http://localhost:8080", 60)
+
+    # the subconfig is reported on its own, after the config
+    report, cache_report = recorder.reports
+    assert cache_report.config is Config.Cache
+    assert report.config is Config
+    assert report.provider_calls == {provider: 1, other: 1}
+    fields = {f.name: f for f in report.fields}
+    assert set(fields) == {"host", "port", "debug", "token", "url"}
+    assert not fields["port"].default_used and fields["port"].provider is provider
+    assert fields["debug"].default_used and fields["url"].default_used
+    assert all(f.lookup_ns >= 0 and f.cast_ns >= 0 for f in report.fields)
+
+    # off again: nothing is reported
+    Config()
+    assert len(recorder.reports) == 2
+
+    slowest = SlowestFields()
+    with observing(slowest):
+        for _ in range(3):
+            Config()
+    assert slowest.constructions == 6
+    assert slowest.fields["Config.port"].constructions == 3
+    assert slowest.provider_calls == {"CountingProvider": 9}
+    assert len(slowest.top(2)) == 2
+
+    out = io.StringIO()
+    slowest.print_report(3, file=out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("6 constructions")
+    assert len(lines) == 2 + 3 + 1